@@ -5,9 +5,11 @@ This module provides functionality to create and configure a Retrieval Augmented
 The pipeline combines document retrieval with language model generation to provide accurate, context-aware responses.
 
 Key components:
-- SentenceTransformersTextEmbedder: Generates embeddings for input queries
-- InMemoryEmbeddingRetriever: Retrieves relevant documents based on embeddings
-- PromptBuilder: Constructs prompts combining query and retrieved context
+- SentenceTransformersTextEmbedder: Generates normalized embeddings for input queries (ONNX Runtime backend by default)
+- FAISSEmbeddingRetriever: Retrieves relevant documents from a FAISS document store based on embeddings
+  (NumbaEmbeddingRetriever, a faster InMemoryEmbeddingRetriever, is used for a MatrixDocumentStore)
+- PromptBuilder: Constructs prompts combining query and retrieved context, from a template
+  compiled once when the pipeline is created
 - HuggingFaceAPIGenerator: Generates responses using LLM
 
 The module uses configuration from environment variables including:
@@ -17,33 +19,81 @@ Important:
 - The LLM model must be available on the Hugging Face Serverless Inference API
 - See https://huggingface.co/inference-api for available models
 
+The pipeline is an AsyncPipeline: it can be run synchronously with run() or awaited with
+run_async(), letting several queries wait on the LLM at the same time.
+
 The pipeline performs the following steps:
 1. Embeds user query using sentence transformers
 2. Retrieves relevant documents from document store
 3. Builds prompt combining query and retrieved context
 4. Generates response using LLM via Hugging Face Serverless Inference API
+
+The steps run sequentially: embedding and retrieval take milliseconds against seconds for
+the LLM call, so starting the LLM call speculatively before retrieval completes would not
+noticeably reduce latency, while paying for LLM calls whose context is then discarded.
 """
 
 
-from typing import Optional
+from typing import Any, Dict, Optional
 import logging
 
-from haystack.components.embedders import SentenceTransformersTextEmbedder
+from haystack_integrations.document_stores.faiss import FAISSDocumentStore
+from haystack_integrations.components.retrievers.faiss import FAISSEmbeddingRetriever
+from haystack.components.builders import PromptBuilder
 from haystack.components.retrievers.in_memory import InMemoryEmbeddingRetriever
-from haystack.components.builders import PromptBuilder 
 from haystack.components.generators import HuggingFaceAPIGenerator
-from haystack import Pipeline
+from haystack import AsyncPipeline
 from haystack.utils import Secret
 
+from F1_RAG.RAG.embedders import create_text_embedder
+from F1_RAG.RAG.document_store import MatrixDocumentStore
+from F1_RAG.RAG.retrievers import NumbaEmbeddingRetriever
+
 logger = logging.getLogger("F1_RAG.RAG.rag_pipeline")
 
+def create_retriever(document_store: object, top_k: int):
+    """
+    Create the embedding retriever matching the type of the document store.
+    
+    Args:
+        document_store (object): Document store containing the knowledge base
+        top_k (int): Number of documents to retrieve
+        
+    Returns:
+        FAISSEmbeddingRetriever for a FAISS document store, NumbaEmbeddingRetriever for a
+        MatrixDocumentStore, InMemoryEmbeddingRetriever for other in-memory document stores
+    """
+    if isinstance(document_store, FAISSDocumentStore):
+        return FAISSEmbeddingRetriever(document_store=document_store, top_k=top_k)
+    if isinstance(document_store, MatrixDocumentStore):
+        return NumbaEmbeddingRetriever(document_store=document_store, top_k=top_k)
+    return InMemoryEmbeddingRetriever(document_store=document_store, top_k=top_k)
+
+def create_prompt_builder(prompt_template: str) -> PromptBuilder:
+    """
+    Create the prompt builder rendering the query and retrieved documents into the prompt.
+    
+    The template is compiled by PromptBuilder when it is created, each run only renders it.
+    
+    Args:
+        prompt_template (str): Jinja template using the query and documents variables
+        
+    Returns:
+        PromptBuilder requiring both the query and the documents
+    """
+    # Required variables make the missing input fail fast, and silence the optional variables warning
+    return PromptBuilder(template=prompt_template, required_variables=["query", "documents"])
+
 def create_rag_pipeline(
     embedder_model: str = "sentence-transformers/all-MiniLM-L6-v2",
     llm_model: str = "HuggingFaceH4/zephyr-7b-beta",
     document_store: Optional[object] = None,
     prompt_template: str = None,
-    top_k: int = 3 #1-3 to limit the number of input tokens with the free serverless inference API
-) -> Pipeline:
+    top_k: int = 3, #1-3 to limit the number of input tokens with the free serverless inference API
+    embedder_backend: str = "onnx",
+    embedder_model_kwargs: Optional[Dict[str, Any]] = None,
+    embedder_torch_dtype: Optional[str] = None
+) -> AsyncPipeline:
     """
     Creates and configures a RAG (Retrieval Augmented Generation) pipeline.
     
@@ -53,9 +103,14 @@ def create_rag_pipeline(
                         Hugging Face Serverless Inference API
         document_store (object): Document store containing the knowledge base
         prompt_template (str): Template string for prompt construction
+        top_k (int): Number of documents to retrieve
+        embedder_backend (str): Inference backend of the embedding model ("torch", "onnx" or "openvino")
+        embedder_model_kwargs (dict): Extra arguments used to load the embedding model, must match
+                                      the ones used to index the documents
+        embedder_torch_dtype (str): Precision of the embedding model weights with the torch backend
         
     Returns:
-        Pipeline: Configured RAG pipeline
+        AsyncPipeline: Configured RAG pipeline
         
     Raises:
         ValueError: If required parameters are missing
@@ -71,12 +126,20 @@ def create_rag_pipeline(
         
     try:
         # Initialize components
-        query_embedder = SentenceTransformersTextEmbedder(model=embedder_model)
-        retriever = InMemoryEmbeddingRetriever(
+        query_embedder = create_text_embedder(
+            model=embedder_model,
+            backend=embedder_backend,
+            model_kwargs=embedder_model_kwargs,
+            torch_dtype=embedder_torch_dtype
+        )
+        # Load the model now rather than on the first query. Haystack keeps loaded models,
+        # so pipelines created later with the same settings reuse it instead of reloading it
+        query_embedder.warm_up()
+        retriever = create_retriever(
             document_store=document_store,
             top_k=top_k  # Add this parameter to limit retrieved documents
         )
-        prompt_builder = PromptBuilder(template=prompt_template)
+        prompt_builder = create_prompt_builder(prompt_template)
         
         generator = HuggingFaceAPIGenerator(
             api_type="serverless_inference_api",  # Using the free Serverless Inference API
@@ -92,7 +155,7 @@ def create_rag_pipeline(
         )
         
         # Create pipeline
-        rag_pipeline = Pipeline()
+        rag_pipeline = AsyncPipeline()
         rag_pipeline.add_component("query_embedder", query_embedder)
         rag_pipeline.add_component("retriever", retriever)
         rag_pipeline.add_component("prompt_builder", prompt_builder)
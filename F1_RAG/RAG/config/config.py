@@ -11,13 +11,51 @@ Question: {{ query }}
 # Default model configurations
 DEFAULT_EMBEDDER_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 DEFAULT_LLM_MODEL = "mistralai/Mistral-7B-Instruct-v0.2" #A chat model would be better, but choice of model is very limited on the serverless API
+DEFAULT_EMBEDDING_DIM = 384  # Must match the output dimension of the embedder model
+DEFAULT_EMBEDDER_BACKEND = "onnx"  # "torch", "onnx" or "openvino"
+# Dynamic INT8 quantized ONNX export shipped with the default embedder model, change it with the model
+DEFAULT_EMBEDDER_MODEL_KWARGS = {
+    "provider": "CPUExecutionProvider",
+    "file_name": "onnx/model_quint8_avx2.onnx",
+}
+# Weights precision with the torch backend: "bfloat16" on CPUs with AVX512-BF16/AMX, "float16" on GPU
+DEFAULT_EMBEDDER_TORCH_DTYPE = None
+
+# Document store configurations
+# "faiss" for a FAISS index (exact or HNSW, see below), "matrix" for an exact search over a contiguous
+# float32 embedding matrix scored by NumbaEmbeddingRetriever
+DEFAULT_DOCUMENT_STORE = "faiss"
+DEFAULT_MATRIX_EMBEDDINGS_PATH = "index/embeddings.f32"  # Memory-mapped matrix of the "matrix" store, None for in-memory
+DEFAULT_INDEX_STRING = "HNSW32_SQfp16"  # FAISS index factory string, vectors stored in float16
+DEFAULT_HNSW_EF_CONSTRUCTION = 200
+DEFAULT_HNSW_EF_SEARCH = 64
+# Indexes needing training, e.g. "IVF256,PQ48" (product quantization, 48 bytes per vector)
+# or "PCA128,HNSW32_SQfp16" (embeddings and queries projected to 128 dimensions)
+DEFAULT_INDEX_TRAIN_SIZE = 10000  # Number of embeddings used to train the index
+DEFAULT_IVF_NPROBE = 16  # Number of inverted lists searched by an IVF index
+DEFAULT_EXACT_SEARCH_MAX_DOCUMENTS = 5000  # Corpora up to this size use an exact flat index
+DEFAULT_INDEX_PATH = "index/f1_rag"  # Saved index files, reloaded while the corpus is unchanged
 
 # Pipeline configurations
-DEFAULT_BATCH_SIZE = 1028
+DEFAULT_BATCH_SIZE = 1028  # Documents per indexing pipeline run
+DEFAULT_EMBEDDER_BATCH_SIZE = 128  # Documents per embedder forward pass, batches are sorted by length
+DEFAULT_INDEXING_WORKERS = 4  # Number of batches indexed concurrently
+DEFAULT_READ_WORKERS = 8  # Number of threads reading document files while indexing
+DEFAULT_EMBEDDING_CACHE_PATH = "cache/embeddings.db"  # SQLite cache of the document embeddings, None to disable
 DEFAULT_TOP_K = 1
 DEFAULT_MAX_NEW_TOKENS = 512
 DEFAULT_TEMPERATURE = 0.1
 
+# Semantic query cache configurations
+DEFAULT_CACHE_THRESHOLD = 0.97  # Minimum cosine similarity between two questions to reuse a reply
+DEFAULT_CACHE_MAX_SIZE = 1024
+DEFAULT_CACHE_TTL = None  # Seconds before a cached reply expires, None to keep it until evicted
+
+# HTTP client configurations, for the requests to the Hugging Face Inference API
+DEFAULT_HTTP_MAX_CONNECTIONS = 16
+DEFAULT_HTTP_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection is kept open for the next query
+DEFAULT_HTTP_RETRIES = 3  # Retries of requests failing to connect
+
 # LLM generation parameters
 GENERATION_KWARGS = {
     "max_new_tokens": DEFAULT_MAX_NEW_TOKENS,
@@ -3,46 +3,114 @@ Document Processing Module
 
 This module handles the execution of document indexing pipelines, including:
 - Document validation and path handling
-- Batch processing of documents
+- Batch processing of documents, grouped by length to minimize padding in the embedder
+  and run concurrently by a pool of worker threads
+- Reading of the document files by a separate pool of threads, so that the pipeline
+  converts in-memory data instead of blocking on file I/O
 - Error handling and logging for document processing
 
 Components:
 - index_documents: Main function to process and index documents through a pipeline
 - validate_documents: Helper function to validate document paths
+- read_document: Helper function reading a document file into memory
+- corpus_fingerprint: Hash identifying a set of documents and their versions
 """
 
+import hashlib
 import logging
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import List, Union
+from typing import Iterator, List, Tuple, Union
 from haystack import Pipeline
+from haystack.dataclasses import ByteStream
 
 # Configure logging
 logger = logging.getLogger("F1_RAG.RAG.document_processor")
 
-def validate_documents(documents: List[Union[str, Path]]) -> List[str]:
+READ_CHUNK_SIZE = 1 << 16  # Bytes read per call after the expected end of a file
+
+def _stat_documents(documents: List[Union[str, Path]]) -> List[Tuple[str, int]]:
     """
-    Validate document paths and convert them to strings.
+    Validate document paths with a single stat call each, returning their size.
     
     Args:
         documents: List of document paths (strings or Path objects)
         
     Returns:
-        List of validated document paths as strings
+        List of validated document paths as strings, with their size in bytes
         
     Raises:
         FileNotFoundError: If any document path is invalid
     """
-    doc_paths = []
+    doc_stats = []
     for doc in documents:
-        path = Path(doc)
-        if not path.exists():
+        path = os.fspath(doc)
+        try:
+            doc_stat = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
             logger.error(f"Document not found: {path}")
-            raise FileNotFoundError(f"Document not found: {path}")
-        if not path.is_file():
+            raise FileNotFoundError(f"Document not found: {path}") from None
+        if not stat.S_ISREG(doc_stat.st_mode):
             logger.error(f"Path is not a file: {path}")
             raise FileNotFoundError(f"Path is not a file: {path}")
-        doc_paths.append(str(path))
-    return doc_paths
+        doc_stats.append((path, doc_stat.st_size))
+    return doc_stats
+
+def validate_documents(documents: List[Union[str, Path]]) -> List[str]:
+    """
+    Validate document paths and convert them to strings.
+    
+    Args:
+        documents: List of document paths (strings or Path objects)
+        
+    Returns:
+        List of validated document paths as strings
+        
+    Raises:
+        FileNotFoundError: If any document path is invalid
+    """
+    return [path for path, _ in _stat_documents(documents)]
+
+def read_document(path: str) -> ByteStream:
+    """
+    Read a document file into memory.
+    
+    The file is read with os.read into a buffer sized from fstat, bypassing the
+    buffered file object of open(), and the isatty and seek calls it makes on opening.
+    A single read of one byte more than the size usually returns the whole file, and
+    reading stops as soon as the size is reached. Reads are only repeated when a read
+    returns fewer bytes than requested (e.g. on network filesystems or above 2 GiB),
+    or when the extra byte shows that the file grew since fstat, then up to its end.
+    
+    Args:
+        path: Path of the document
+        
+    Returns:
+        ByteStream with the file content and the metadata the converter sets for a path
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        received = 0
+        # One more byte than the size, so that a file grown since fstat is noticed
+        count = size + 1
+        while True:
+            chunk = os.read(fd, count)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+            if received == size:
+                break
+            count = size + 1 - received if received < size else READ_CHUNK_SIZE
+        data = b"".join(chunks)
+    finally:
+        os.close(fd)
+    return ByteStream(data=data, meta={"file_path": path})
 
 def process_batch(pipeline, batch):
     """Process a batch of documents through the indexing pipeline."""
@@ -57,7 +125,9 @@ def process_batch(pipeline, batch):
 def index_documents(
     pipeline: Pipeline, 
     documents: List[Union[str, Path]], 
-    batch_size: int = 32
+    batch_size: int = 32,
+    max_workers: int = 4,
+    read_workers: int = 8
 ) -> None:
     """
     Index a list of documents using the provided pipeline.
@@ -66,11 +136,14 @@ def index_documents(
         pipeline: Configured indexing pipeline
         documents: List of paths to documents (can be string or Path objects)
         batch_size: Number of documents to process in each batch
+        max_workers: Number of batches processed concurrently, so that file reading
+                     of one batch overlaps with embedding of another
+        read_workers: Number of threads reading document files
         
     Raises:
         FileNotFoundError: If any document path is invalid
         RuntimeError: If pipeline execution fails
-        ValueError: If batch_size is less than 1
+        ValueError: If batch_size, max_workers or read_workers is less than 1
     """
     if not documents:
         logger.warning("No documents provided for indexing")
@@ -78,29 +151,44 @@ def index_documents(
         
     if batch_size < 1:
         raise ValueError("batch_size must be at least 1")
+    
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    
+    if read_workers < 1:
+        raise ValueError("read_workers must be at least 1")
         
     try:
         logger.info(f"Starting to index {len(documents)} documents")
         
-        # Validate all document paths
-        doc_paths = validate_documents(documents)
+        # Validate all document paths, getting their size from the same stat call
+        doc_stats = _stat_documents(documents)
+        
+        # Sort by file size (a proxy for token count) so each batch holds documents of
+        # similar length and the embedder pads them as little as possible
+        doc_stats.sort(key=lambda doc_stat: doc_stat[1])
+        doc_paths = [path for path, _ in doc_stats]
         
         # Process documents in batches
-        total_batches = (len(doc_paths) + batch_size - 1) // batch_size
-        for i in range(0, len(doc_paths), batch_size):
-            batch = doc_paths[i:i + batch_size]
-            current_batch = (i // batch_size) + 1
-            logger.debug(
-                f"Processing batch {current_batch}/{total_batches}, "
-                f"size: {len(batch)}"
-            )
-            
-            process_batch(pipeline, batch)
+        batches = [doc_paths[i:i + batch_size] for i in range(0, len(doc_paths), batch_size)]
+        total_batches = len(batches)
+        
+        # Load models once before the workers share the pipeline
+        pipeline.warm_up()
+        with ThreadPoolExecutor(max_workers=read_workers) as reader, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def run_batch(current_batch, batch):
+                # Files are read in parallel, while the other workers embed their batches
+                sources = list(reader.map(read_document, batch))
+                logger.debug(
+                    f"Processing batch {current_batch}/{total_batches}, "
+                    f"size: {len(sources)}"
+                )
+                process_batch(pipeline, sources)
+                logger.debug(f"Completed batch {current_batch}/{total_batches}")
             
-            logger.debug(
-                f"Completed batch {current_batch}/{total_batches} "
-                f"({(current_batch/total_batches)*100:.1f}%)"
-            )
+            # Consume the results to re-raise the first batch failure
+            list(executor.map(run_batch, range(1, total_batches + 1), batches))
                 
         logger.info("Document indexing completed successfully")
         
@@ -108,6 +196,36 @@ def index_documents(
         logger.error(f"Error during document indexing: {str(e)}")
         raise
 
+def corpus_fingerprint(documents: List[Union[str, Path]], *settings: str) -> str:
+    """
+    Compute a fingerprint changing whenever a document is added, removed or modified.
+    
+    Args:
+        documents: List of document paths
+        *settings: Indexing settings the index depends on (e.g. embedder model)
+        
+    Returns:
+        SHA-1 hex digest of the sorted paths, modification times and sizes, and the settings
+    """
+    digest = hashlib.sha1()
+    for setting in settings:
+        digest.update(f"{setting}\n".encode("utf-8"))
+    for path in sorted(str(doc) for doc in documents):
+        file_stat = os.stat(path)
+        digest.update(f"{path}\0{file_stat.st_mtime_ns}\0{file_stat.st_size}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def _scan_directory(directory: str, pattern: str, recursive: bool) -> Iterator[str]:
+    """Yield the paths of the files matching the pattern, without creating a Path per entry."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # Symbolic links to directories are not followed, as with Path.rglob
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    yield from _scan_directory(entry.path, pattern, recursive)
+            elif fnmatch(entry.name, pattern) and entry.is_file():
+                yield entry.path
+
 def get_documents_from_directory(
     directory: Union[str, Path], 
     pattern: str = "*.txt",
@@ -118,7 +236,7 @@ def get_documents_from_directory(
     
     Args:
         directory: Directory to search for documents
-        pattern: Glob pattern to match files (e.g., "*.txt", "*.pdf")
+        pattern: Glob pattern to match file names (e.g., "*.txt", "*.pdf")
         recursive: Whether to search subdirectories
         
     Returns:
@@ -126,22 +244,21 @@ def get_documents_from_directory(
         
     Raises:
         FileNotFoundError: If directory doesn't exist
+        NotADirectoryError: If directory is not a directory
     """
-    directory = Path(directory)
-    if not directory.exists():
-        raise FileNotFoundError(f"Directory not found: {directory}")
+    directory = os.fspath(directory)
+    try:
+        mode = os.stat(directory).st_mode
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Directory not found: {directory}") from None
         
-    if not directory.is_dir():
+    if not stat.S_ISDIR(mode):
         raise NotADirectoryError(f"Path is not a directory: {directory}")
         
     logger.debug(f"Searching for documents matching '{pattern}' in {directory}")
     
-    if recursive:
-        files = directory.rglob(pattern)
-    else:
-        files = directory.glob(pattern)
-        
-    documents = sorted(files)  # Sort for consistent ordering
+    # Sort for consistent ordering
+    documents = [Path(path) for path in sorted(_scan_directory(directory, pattern, recursive))]
     logger.info(f"Found {len(documents)} documents matching pattern '{pattern}'")
     
     return documents
@@ -0,0 +1,681 @@
+"""
+Document Store Module
+
+This module provides the document store holding the indexed knowledge base.
+Documents are stored in a FAISS HNSW index, giving approximate nearest neighbour search
+in logarithmic time instead of a brute-force scan over every document embedding.
+
+Embeddings must be L2-normalized (normalize_embeddings=True on the embedders) so that
+the inner product used by the index is the cosine similarity. Writes are serialized so
+that several indexing batches can be written concurrently.
+
+Indexes needing training, such as product-quantized "IVF256,PQ48" (48 bytes per vector
+instead of 1.5 KB for float32 MiniLM embeddings), are supported: written vectors are
+buffered until train_size of them are available, then used to train the index and added.
+Call train_index once all documents are written to index a smaller remainder.
+The same applies to a PCA projection in front of the index, e.g. "PCA128,HNSW32_SQfp16":
+the PCA is fitted on the first train_size embeddings, then both the stored vectors and
+the queries are projected (without centering, to preserve inner products) to 128
+dimensions, scanning 3x fewer bytes per comparison.
+
+Small corpora are better served by an exact "Flat" index: scanning a few thousand
+embeddings takes well under a millisecond, builds instantly and never misses a neighbour.
+select_index_string picks it below a corpus size threshold.
+
+The store can be saved along with a fingerprint of the indexed corpus, and only loaded
+back if the fingerprint still matches, so that an unchanged corpus is not re-embedded.
+
+For exact search, MatrixDocumentStore keeps the embeddings of an in-memory store in one
+contiguous float32 matrix (structure of arrays) instead of one list per Document, so that
+a query is scored with a single matrix-vector product. The matrix can be backed by a
+memory-mapped file, so that its pages are loaded on demand and shared by the processes
+mapping the same file instead of being copied into each process heap. A saved store maps
+the existing file back when loaded, instead of reading every embedding into memory.
+
+Components:
+- HNSWDocumentStore: FAISS document store using an inner-product HNSW (or IVF-PQ) index
+- MatrixDocumentStore: In-memory document store scoring a contiguous embedding matrix
+- create_document_store: Factory creating the document store from configuration
+- select_index_string: Chooses between exact and approximate search from the corpus size
+"""
+
+import json
+import logging
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import faiss
+import numpy as np
+from haystack import Document, default_to_dict
+from haystack.document_stores.errors import DocumentStoreError
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+from haystack.document_stores.types import DuplicatePolicy
+from haystack.utils import expit
+from haystack_integrations.document_stores.faiss import FAISSDocumentStore
+
+logger = logging.getLogger("F1_RAG.RAG.document_store")
+
+MATRIX_GROWTH_ROWS = 4096  # Rows added to the embedding matrix each time it is full
+DOT_PRODUCT_SCALING_FACTOR = 100  # Same scaling as InMemoryDocumentStore
+EXACT_INDEX_STRING = "Flat"  # Brute-force inner product index
+
+def _train_index(index: faiss.Index, vectors: np.ndarray) -> None:
+    """
+    Train an index on vectors, keeping projections in front of it linear.
+
+    A trained PCA subtracts the mean of the vectors before projecting them, which changes
+    inner products by a term depending on each document. The mean subtraction is removed,
+    so that the projected inner products approximate the original ones.
+    """
+    base_index = faiss.downcast_index(index.index)  # Index wrapped in the IndexIDMap
+    if not isinstance(base_index, faiss.IndexPreTransform):
+        index.train(vectors)
+        return
+
+    for position in range(base_index.chain.size()):
+        transform = faiss.downcast_VectorTransform(base_index.chain.at(position))
+        transform.train(vectors)
+        if isinstance(transform, faiss.LinearTransform):
+            faiss.copy_array_to_vector(np.zeros(transform.d_out, dtype=np.float32), transform.b)
+        vectors = transform.apply(vectors)
+    base_index.index.train(vectors)
+    base_index.is_trained = True
+    index.is_trained = True
+
+class _TrainingBuffer:
+    """Stand-in for an untrained FAISS index, keeping added vectors until it can be trained."""
+
+    def __init__(self, index: faiss.Index, train_size: int):
+        self.index = index
+        self.train_size = train_size
+        self._vectors: List[np.ndarray] = []
+        self._ids: List[np.ndarray] = []
+
+    @property
+    def ntotal(self) -> int:
+        return sum(len(ids) for ids in self._ids)
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        self._vectors.append(vectors)
+        self._ids.append(ids)
+        if self.ntotal >= self.train_size:
+            self.flush()
+
+    def remove_ids(self, ids: np.ndarray) -> None:
+        for position, buffered_ids in enumerate(self._ids):
+            kept = ~np.isin(buffered_ids, ids)
+            self._vectors[position] = self._vectors[position][kept]
+            self._ids[position] = buffered_ids[kept]
+
+    def flush(self) -> None:
+        """Train the index on the buffered vectors, then add them to it."""
+        if self.ntotal == 0:
+            return
+        vectors = np.concatenate(self._vectors)
+        ids = np.concatenate(self._ids)
+        logger.info(f"Training FAISS index on {len(ids)} vectors")
+        _train_index(self.index, vectors)
+        self.index.add_with_ids(vectors, ids)
+        self._vectors, self._ids = [], []
+
+class HNSWDocumentStore(FAISSDocumentStore):
+    """FAISS document store ranking documents by inner product in an HNSW graph."""
+
+    def __init__(
+        self,
+        embedding_dim: int = 384,
+        index_string: str = "HNSW32",
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        train_size: int = 10000,
+        nprobe: int = 16
+    ):
+        """
+        Initialize an empty in-memory HNSW document store.
+
+        Args:
+            embedding_dim: Dimension of the document embeddings
+            index_string: FAISS index factory string, e.g. "HNSW32", "HNSW32_SQfp16" or "IVF256,PQ48"
+            ef_construction: Size of the candidate list while building the HNSW graph
+            ef_search: Size of the candidate list while searching the HNSW graph
+            train_size: Number of vectors used to train the index, if it needs training
+            nprobe: Number of inverted lists searched by an IVF index
+        """
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.train_size = train_size
+        self.nprobe = nprobe
+        self._write_lock = threading.Lock()
+        self._training_buffer: Optional[_TrainingBuffer] = None
+        super().__init__(index_string=index_string, embedding_dim=embedding_dim)
+
+    def write_documents(
+        self,
+        documents: List[Document],
+        policy: DuplicatePolicy = DuplicatePolicy.FAIL
+    ) -> int:
+        """
+        Write documents to the store, one call at a time.
+
+        Args:
+            documents: Documents to write
+            policy: Policy to handle duplicate documents
+
+        Returns:
+            Number of documents written
+        """
+        with self._write_lock:
+            return super().write_documents(documents, policy=policy)
+
+    def train_index(self) -> None:
+        """
+        Train the index on the vectors written so far and add them, if not trained yet.
+
+        Raises:
+            DocumentStoreError: If there are too few vectors to train the index
+        """
+        with self._write_lock:
+            if self._training_buffer is None or self.index.is_trained:
+                return
+            try:
+                self._training_buffer.flush()
+            except RuntimeError as e:
+                raise DocumentStoreError(
+                    f"Could not train FAISS index '{self.index_string}' "
+                    f"on {self._training_buffer.ntotal} vectors: {str(e)}"
+                )
+
+    def save(self, index_path: Union[str, Path], fingerprint: Optional[str] = None) -> None:
+        """
+        Train the index if needed, then save the index and documents to disk.
+
+        Args:
+            index_path: Path of the saved files, without extension
+            fingerprint: Fingerprint of the indexed corpus, checked by load_if_current
+        """
+        self.train_index()
+        path = Path(index_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        super().save(path)
+        if fingerprint is not None:
+            path.with_suffix(".fingerprint").write_text(fingerprint, encoding="utf-8")
+        logger.info(f"Saved {self.count_documents()} documents to {path}")
+
+    def load_if_current(self, index_path: Union[str, Path], fingerprint: str) -> bool:
+        """
+        Load the saved index and documents if they were saved for the same corpus.
+
+        Args:
+            index_path: Path of the saved files, without extension
+            fingerprint: Fingerprint of the corpus to index
+
+        Returns:
+            True if the store was loaded, False if there is no saved index for this corpus
+        """
+        path = Path(index_path)
+        fingerprint_file = path.with_suffix(".fingerprint")
+        if not (fingerprint_file.exists() and path.with_suffix(".faiss").exists()):
+            return False
+        if fingerprint_file.read_text(encoding="utf-8") != fingerprint:
+            logger.info(f"Corpus changed since the index was saved to {path}")
+            return False
+
+        with self._write_lock:
+            self.load(path)
+            self._training_buffer = None  # Saved indexes are trained
+        logger.info(f"Loaded {self.count_documents()} documents from {path}")
+        return True
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """
+        Retrieve the documents with the highest inner product with the query embedding.
+
+        FAISSDocumentStore converts the scores of a "Flat" index as if they were L2 distances,
+        which inverts the ranking of inner-product scores, so the search is done here with
+        the raw inner product as score whatever the index.
+
+        Args:
+            query_embedding: Embedding of the query
+            top_k: Maximum number of documents to return
+            filters: Filters applied to the retrieved documents
+
+        Returns:
+            Top-k documents with their inner product score, most similar first
+        """
+        if not self.index or self.index.ntotal == 0:
+            return []
+
+        # Filters are applied after the search, so more candidates are fetched
+        fetch_k = min(self.index.ntotal, top_k * 10) if filters else top_k
+        scores, ids = self.index.search(np.array([query_embedding], dtype=np.float32), fetch_k)
+
+        results = []
+        for score, int_id in zip(scores[0], ids[0]):
+            doc_id = self.id_map.get(int(int_id)) if int_id != -1 else None
+            if doc_id is None or doc_id not in self.documents:
+                continue
+            document = self.documents[doc_id]
+            if filters and not self._matches_filters(document, filters):
+                continue
+            results.append(replace(document, score=float(score)))
+            if len(results) >= top_k:
+                break
+        return results
+
+    def _get_index_or_raise(self) -> Any:
+        """Return the index, or the training buffer until the index is trained."""
+        index = super()._get_index_or_raise()
+        if self._training_buffer is not None and not index.is_trained:
+            return self._training_buffer
+        return index
+
+    def _create_new_index(self) -> None:
+        """Create a new inner-product FAISS index and apply the HNSW parameters."""
+        try:
+            base_index = faiss.index_factory(
+                self.embedding_dim, self.index_string, faiss.METRIC_INNER_PRODUCT
+            )
+        except RuntimeError as e:
+            raise DocumentStoreError(
+                f"Could not create FAISS index with factory string '{self.index_string}': {str(e)}"
+            )
+
+        hnsw_index = faiss.downcast_index(base_index)
+        if isinstance(hnsw_index, faiss.IndexPreTransform):
+            # Projection (e.g. PCA) applied before the HNSW index
+            hnsw_index = faiss.downcast_index(hnsw_index.index)
+        if hasattr(hnsw_index, "hnsw"):
+            hnsw_index.hnsw.efConstruction = self.ef_construction
+            hnsw_index.hnsw.efSearch = self.ef_search
+        ivf_index = faiss.try_extract_index_ivf(base_index)
+        if ivf_index is not None:
+            ivf_index.nprobe = self.nprobe
+
+        self.index = faiss.IndexIDMap(base_index)
+        self._training_buffer = None if base_index.is_trained else _TrainingBuffer(self.index, self.train_size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the store to a dictionary."""
+        return default_to_dict(
+            self,
+            embedding_dim=self.embedding_dim,
+            index_string=self.index_string,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+            train_size=self.train_size,
+            nprobe=self.nprobe
+        )
+
+class MatrixDocumentStore(InMemoryDocumentStore):
+    """InMemoryDocumentStore keeping the document embeddings in a contiguous (N, d) matrix."""
+
+    def __init__(
+        self,
+        embedding_similarity_function: str = "cosine",
+        embeddings_path: Optional[Union[str, Path]] = None,
+        **kwargs: Any
+    ):
+        """
+        Initialize an empty in-memory document store.
+
+        Args:
+            embedding_similarity_function: "cosine" or "dot_product"
+            embeddings_path: File memory-mapping the embedding matrix, overwritten when documents
+                             are written to an empty store, None to keep the matrix in memory
+            **kwargs: Other arguments of InMemoryDocumentStore
+        """
+        super().__init__(embedding_similarity_function=embedding_similarity_function, **kwargs)
+        self.embeddings_path = Path(embeddings_path) if embeddings_path is not None else None
+        self._write_lock = threading.Lock()
+        self._emb_matrix: Optional[np.ndarray] = None
+        self._row_documents: List[Document] = []  # Document of each matrix row
+        self._rows: Dict[str, int] = {}  # Matrix row of each document id
+
+    def write_documents(
+        self,
+        documents: List[Document],
+        policy: DuplicatePolicy = DuplicatePolicy.NONE
+    ) -> int:
+        """
+        Write documents to the store and append their embeddings to the matrix.
+
+        Args:
+            documents: Documents to write
+            policy: Policy to handle duplicate documents
+
+        Returns:
+            Number of documents written
+
+        Raises:
+            DocumentStoreError: If an embedding size differs from the stored embeddings
+        """
+        with self._write_lock:
+            written = super().write_documents(documents, policy=policy)
+            # Only documents actually stored: skipped duplicates are not, and overwritten ones were removed
+            for document in documents:
+                if document.embedding is not None and self.storage.get(document.id) is document \
+                        and document.id not in self._rows:
+                    self._append_row(document)
+            self._flush()
+            return written
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        """
+        Delete the documents with the given ids and their matrix rows.
+
+        Args:
+            document_ids: Ids of the documents to delete
+        """
+        super().delete_documents(document_ids)
+        for doc_id in document_ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            # Move the last row into the freed one to keep the matrix contiguous
+            last = len(self._row_documents) - 1
+            last_document = self._row_documents.pop()
+            if row != last:
+                self._emb_matrix[row] = self._emb_matrix[last]
+                self._row_documents[row] = last_document
+                self._rows[last_document.id] = row
+        self._flush()
+
+    def delete_all_documents(self) -> None:
+        """Delete all documents and the embedding matrix."""
+        super().delete_all_documents()
+        self._emb_matrix = None
+        self._row_documents = []
+        self._rows = {}
+
+    def train_index(self) -> None:
+        """Do nothing: the embedding matrix is searched exactly and needs no training."""
+
+    def save(self, index_path: Union[str, Path], fingerprint: Optional[str] = None) -> None:
+        """
+        Save the documents and the embedding matrix to disk.
+
+        The documents are saved without their embeddings, in the order of the matrix rows,
+        to index_path with a .documents.json suffix. A memory-mapped matrix stays in its
+        file, which is only flushed; an in-memory matrix is written to index_path with
+        a .f32 suffix.
+
+        Args:
+            index_path: Path of the saved files, without extension
+            fingerprint: Fingerprint of the indexed corpus, checked by load_if_current
+        """
+        path = Path(index_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._write_lock:
+            matrix, row_documents = self.embedding_matrix()
+            if self.embeddings_path is None:
+                embeddings_file = path.with_suffix(".f32")
+                np.ascontiguousarray(matrix).tofile(embeddings_file)
+            else:
+                self._flush()
+                embeddings_file = self.embeddings_path
+            other_documents = [doc for doc in self.storage.values() if doc.id not in self._rows]
+            data = {
+                "embeddings_path": str(embeddings_file),
+                "rows": len(row_documents),
+                "dim": int(matrix.shape[1]),
+                "documents": [
+                    replace(doc, embedding=None).to_dict(flatten=False)
+                    for doc in row_documents + other_documents
+                ]
+            }
+            path.with_suffix(".documents.json").write_text(json.dumps(data), encoding="utf-8")
+        if fingerprint is not None:
+            path.with_suffix(".fingerprint").write_text(fingerprint, encoding="utf-8")
+        logger.info(f"Saved {len(data['documents'])} documents to {path}")
+
+    def load_if_current(self, index_path: Union[str, Path], fingerprint: str) -> bool:
+        """
+        Load the saved documents and map the saved embedding matrix, if saved for the same corpus.
+
+        The embeddings are not read: the matrix file is mapped in place, its pages being
+        loaded on demand and shared with the other processes mapping it.
+
+        Args:
+            index_path: Path of the saved files, without extension
+            fingerprint: Fingerprint of the corpus to index
+
+        Returns:
+            True if the store was loaded, False if there is no saved store for this corpus
+        """
+        path = Path(index_path)
+        fingerprint_file = path.with_suffix(".fingerprint")
+        documents_file = path.with_suffix(".documents.json")
+        if not (fingerprint_file.exists() and documents_file.exists()):
+            return False
+        if fingerprint_file.read_text(encoding="utf-8") != fingerprint:
+            logger.info(f"Corpus changed since the store was saved to {path}")
+            return False
+
+        data = json.loads(documents_file.read_text(encoding="utf-8"))
+        rows, dim = data["rows"], data["dim"]
+        embeddings_file = Path(data["embeddings_path"])
+        row_size = dim * np.dtype(np.float32).itemsize
+        file_size = embeddings_file.stat().st_size if embeddings_file.exists() else 0
+        if rows and file_size < rows * row_size:
+            logger.warning(f"Embedding file {embeddings_file} is smaller than its {rows} saved rows")
+            return False
+
+        documents = [Document.from_dict(doc) for doc in data["documents"]]
+        with self._write_lock:
+            self.delete_all_documents()
+            # Bypass write_documents: the embeddings are already in the matrix file
+            InMemoryDocumentStore.write_documents(self, documents, policy=DuplicatePolicy.OVERWRITE)
+            self.embeddings_path = embeddings_file
+            if rows:
+                self._emb_matrix = np.memmap(
+                    embeddings_file, dtype=np.float32, mode="r+", shape=(file_size // row_size, dim)
+                )
+            self._row_documents = documents[:rows]
+            self._rows = {doc.id: row for row, doc in enumerate(self._row_documents)}
+        logger.info(f"Loaded {len(documents)} documents from {path}, mapping {rows} embeddings")
+        return True
+
+    def embedding_matrix(self) -> Tuple[np.ndarray, List[Document]]:
+        """
+        Return the embedding matrix and the document of each of its rows.
+
+        With the cosine similarity, the rows are L2-normalized.
+
+        Returns:
+            (N, d) float32 view of the matrix and the list of the N documents
+        """
+        size = len(self._row_documents)
+        if self._emb_matrix is None:
+            return np.empty((0, 0), dtype=np.float32), []
+        return self._emb_matrix[:size], list(self._row_documents)
+
+    def embedding_retrieval(
+        self,
+        query_embedding: List[float],
+        filters: Optional[Dict[str, Any]] = None,
+        top_k: int = 10,
+        scale_score: bool = False,
+        return_embedding: Optional[bool] = False
+    ) -> List[Document]:
+        """
+        Retrieve the documents most similar to the query embedding.
+
+        Filtered queries only score the matrix rows of the matching documents.
+
+        Args:
+            query_embedding: Embedding of the query
+            filters: Filters narrowing down the documents to search
+            top_k: Maximum number of documents to return
+            scale_score: Whether to scale the scores to the range [0, 1]
+            return_embedding: Whether to return the embeddings of the documents
+
+        Returns:
+            Top-k documents with their similarity score, most similar first
+
+        Raises:
+            ValueError: If the query embedding is empty
+            DocumentStoreError: If the query embedding size differs from the document embeddings
+        """
+        if len(query_embedding) == 0:
+            raise ValueError("query_embedding should be a non-empty list of floats.")
+
+        matrix, documents = self.embedding_matrix()
+        if filters and documents:
+            rows = [self._rows[doc.id] for doc in self.filter_documents(filters) if doc.id in self._rows]
+            matrix, documents = matrix[rows], [documents[row] for row in rows]
+        if not documents or top_k < 1:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (matrix.shape[1],):
+            raise DocumentStoreError(
+                f"Query embedding size {query.shape[0]} does not match document embedding size {matrix.shape[1]}"
+            )
+        if self.embedding_similarity_function == "cosine":
+            norm = np.linalg.norm(query)
+            query = query / (norm if norm > 0 else 1.0)
+
+        scores = matrix @ query
+        top_k = min(top_k, len(documents))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return_embedding = self.return_embedding if return_embedding is None else return_embedding
+        results = []
+        for row in top:
+            score = float(scores[row])
+            if scale_score:
+                score = (score + 1) / 2 if self.embedding_similarity_function == "cosine" \
+                    else expit(score / DOT_PRODUCT_SCALING_FACTOR)
+            document = documents[row]
+            embedding = None
+            if return_embedding:
+                # Documents loaded from disk keep their embedding in the matrix only
+                embedding = document.embedding if document.embedding is not None else matrix[row].tolist()
+            results.append(replace(document, score=score, embedding=embedding))
+        return results
+
+    def _append_row(self, document: Document) -> None:
+        """Copy the embedding of a document into the next free row of the matrix."""
+        embedding = np.asarray(document.embedding, dtype=np.float32)
+        size = len(self._row_documents)
+        if self._emb_matrix is None:
+            self._emb_matrix = self._resize(MATRIX_GROWTH_ROWS, embedding.shape[0])
+        elif embedding.shape != (self._emb_matrix.shape[1],):
+            raise DocumentStoreError(
+                f"Embedding size {embedding.shape[0]} of document {document.id} "
+                f"does not match the store embedding size {self._emb_matrix.shape[1]}"
+            )
+        elif size == self._emb_matrix.shape[0]:
+            self._emb_matrix = self._resize(size + MATRIX_GROWTH_ROWS, self._emb_matrix.shape[1])
+
+        if self.embedding_similarity_function == "cosine":
+            norm = np.linalg.norm(embedding)
+            embedding = embedding / (norm if norm > 0 else 1.0)
+        self._emb_matrix[size] = embedding
+        self._row_documents.append(document)
+        self._rows[document.id] = size
+
+    def _resize(self, rows: int, dim: int) -> np.ndarray:
+        """Return a matrix of the given number of rows, keeping the rows already written."""
+        if self.embeddings_path is None:
+            matrix = np.empty((rows, dim), dtype=np.float32)
+            if self._emb_matrix is not None:
+                size = len(self._row_documents)
+                matrix[:size] = self._emb_matrix[:size]
+            return matrix
+
+        # Rows are stored contiguously, so extending the file keeps the existing ones in place
+        if self._emb_matrix is None:
+            self.embeddings_path.parent.mkdir(parents=True, exist_ok=True)
+            mode = "w+b"  # Start from an empty file
+        else:
+            self._emb_matrix.flush()
+            mode = "r+b"
+        with open(self.embeddings_path, mode) as f:
+            f.truncate(rows * dim * np.dtype(np.float32).itemsize)
+        logger.debug(f"Mapped {rows} embedding rows from {self.embeddings_path}")
+        return np.memmap(self.embeddings_path, dtype=np.float32, mode="r+", shape=(rows, dim))
+
+    def _flush(self) -> None:
+        """Write the changes of a memory-mapped matrix to its file."""
+        if isinstance(self._emb_matrix, np.memmap):
+            self._emb_matrix.flush()
+
+def select_index_string(document_count: int, index_string: str, exact_search_max_documents: int) -> str:
+    """
+    Choose the FAISS index of a corpus from its size.
+
+    Below the threshold, an exact flat index is as fast as an approximate one and
+    returns the true nearest neighbours, without construction or training cost.
+
+    Args:
+        document_count: Number of documents to index
+        index_string: FAISS index factory string used for larger corpora
+        exact_search_max_documents: Largest corpus searched exactly, 0 to always use index_string
+
+    Returns:
+        FAISS index factory string
+    """
+    if document_count <= exact_search_max_documents:
+        return EXACT_INDEX_STRING
+    return index_string
+
+def create_document_store(
+    embedding_dim: int = 384,
+    index_string: str = "HNSW32",
+    ef_construction: int = 200,
+    ef_search: int = 64,
+    train_size: int = 10000,
+    nprobe: int = 16,
+    store_type: str = "faiss",
+    embeddings_path: Optional[Union[str, Path]] = None
+) -> Union[HNSWDocumentStore, MatrixDocumentStore]:
+    """
+    Create the document store used to index and retrieve documents.
+
+    Args:
+        embedding_dim: Dimension of the document embeddings, must match the embedder model
+        index_string: FAISS index factory string
+        ef_construction: HNSW candidate list size at construction time
+        ef_search: HNSW candidate list size at search time
+        train_size: Number of vectors used to train the index, if it needs training
+        nprobe: Number of inverted lists searched by an IVF index
+        store_type: "faiss" for a FAISS index, "matrix" for an exact search over an embedding matrix
+        embeddings_path: File memory-mapping the embedding matrix of a "matrix" store, None to keep it in memory
+
+    Returns:
+        Empty document store
+
+    Raises:
+        ValueError: If the store type is unknown
+        RuntimeError: If the FAISS index cannot be created
+    """
+    if store_type == "matrix":
+        logger.info("Created matrix document store")
+        return MatrixDocumentStore(embeddings_path=embeddings_path)
+    if store_type != "faiss":
+        raise ValueError(f"Unknown document store type '{store_type}', expected 'faiss' or 'matrix'")
+
+    try:
+        document_store = HNSWDocumentStore(
+            embedding_dim=embedding_dim,
+            index_string=index_string,
+            ef_construction=ef_construction,
+            ef_search=ef_search,
+            train_size=train_size,
+            nprobe=nprobe
+        )
+    except DocumentStoreError as e:
+        logger.error(f"Failed to create document store: {str(e)}")
+        raise RuntimeError(f"Document store creation failed: {str(e)}")
+
+    logger.info(f"Created FAISS document store with index '{index_string}'")
+    return document_store
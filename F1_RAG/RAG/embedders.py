@@ -0,0 +1,166 @@
+"""
+Embedders Module
+
+This module builds the SentenceTransformers embedders used by the indexing and RAG pipelines.
+Both embedders are created from the same backend settings: queries and documents must be
+embedded by the same model, and Haystack only loads the weights once when the settings match.
+The loaded model is kept for the lifetime of the process, so creating another embedder with
+the same settings (e.g. for a new RAG pipeline) does not load the weights again.
+
+By default the model runs on ONNX Runtime instead of PyTorch eager mode, which gives a
+higher CPU throughput. The model file can be chosen through model_kwargs, e.g. one of the
+optimized or INT8 quantized exports shipped with the sentence-transformers models.
+With the PyTorch backend, the weights can be loaded in half precision (bfloat16 on CPUs
+with AVX512-BF16/AMX, float16 on GPU) to halve the bytes moved by each matmul.
+
+The module uses configuration from environment variables including:
+- TORCH_COMPILE: Set to 1 to compile the transformer with torch.compile (torch backend only).
+  The first batches take ~30s longer to embed while the kernels are compiled.
+- HF_HOME: Directory of the downloaded model weights, e.g. on a tmpfs to avoid cold disk reads.
+  It must be set before the process starts, not in the .env file.
+
+Components:
+- create_document_embedder: Creates the embedder for the indexing pipeline
+- create_text_embedder: Creates the query embedder for the RAG pipeline
+- compile_embedder: Compiles the transformer of a warmed-up embedder with torch.compile
+- embed_texts: Embeds several queries with a text embedder in a single forward pass
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, Union
+
+from haystack.components.embedders import (
+    SentenceTransformersDocumentEmbedder,
+    SentenceTransformersTextEmbedder
+)
+
+logger = logging.getLogger("F1_RAG.RAG.embedders")
+
+Embedder = Union[SentenceTransformersDocumentEmbedder, SentenceTransformersTextEmbedder]
+
+def _embedder_kwargs(
+    model: str,
+    backend: str,
+    model_kwargs: Optional[Dict[str, Any]],
+    torch_dtype: Optional[str]
+) -> Dict[str, Any]:
+    """Build the settings shared by the document and query embedders."""
+    if torch_dtype is not None and backend == "torch":
+        model_kwargs = {**(model_kwargs or {}), "torch_dtype": torch_dtype}
+    return {
+        "model": model,
+        "backend": backend,
+        "model_kwargs": model_kwargs,
+        "normalize_embeddings": True  # Inner product on normalized embeddings is the cosine similarity
+    }
+
+def _maybe_compile(embedder: Embedder) -> Embedder:
+    """Compile the embedder if enabled through the TORCH_COMPILE environment variable."""
+    if os.getenv("TORCH_COMPILE") == "1":
+        compile_embedder(embedder)
+    return embedder
+
+def compile_embedder(embedder: Embedder) -> None:
+    """
+    Load the embedder model and compile its transformer with torch.compile.
+    
+    The compiled module is shared by every embedder using the same model settings,
+    since Haystack shares the loaded model between them.
+    
+    Args:
+        embedder: Embedder to compile, using the torch backend
+    """
+    if embedder.backend != "torch":
+        logger.warning(f"torch.compile is only supported with the torch backend, not '{embedder.backend}'")
+        return
+
+    import torch
+
+    embedder.warm_up()
+    transformer = embedder.embedding_backend.model[0]
+    if hasattr(transformer.auto_model, "_orig_mod"):
+        return  # Already compiled through another embedder
+
+    # CUDA graphs cut kernel launch overhead on GPU, they are not available on CPU
+    mode = "reduce-overhead" if embedder.device.to_torch_str().startswith("cuda") else "default"
+    transformer.auto_model = torch.compile(
+        transformer.auto_model,
+        mode=mode,
+        backend="inductor",
+        dynamic=True  # Batches have varying sequence lengths
+    )
+    logger.info(f"Compiled embedder model {embedder.model} with torch.compile (mode: {mode})")
+
+def embed_texts(embedder: SentenceTransformersTextEmbedder, texts: List[str]) -> List[List[float]]:
+    """
+    Embed several texts at once with a text embedder.
+    
+    The text embedder only accepts a single string, so the texts are passed to its
+    backend directly, with the same settings as SentenceTransformersTextEmbedder.run.
+    
+    Args:
+        embedder: Text embedder to use
+        texts: Texts to embed
+        
+    Returns:
+        Embedding of each text, in the order of the texts
+    """
+    if embedder.embedding_backend is None:
+        embedder.warm_up()
+    return embedder.embedding_backend.embed(
+        [embedder.prefix + text + embedder.suffix for text in texts],
+        batch_size=embedder.batch_size,
+        show_progress_bar=embedder.progress_bar,
+        normalize_embeddings=embedder.normalize_embeddings,
+        precision=embedder.precision,
+        **(embedder.encode_kwargs or {})
+    )
+
+def create_document_embedder(
+    model: str = "sentence-transformers/all-MiniLM-L6-v2",
+    backend: str = "onnx",
+    model_kwargs: Optional[Dict[str, Any]] = None,
+    torch_dtype: Optional[str] = None,
+    batch_size: int = 32
+) -> SentenceTransformersDocumentEmbedder:
+    """
+    Create the document embedder of the indexing pipeline.
+
+    Args:
+        model: Name of the sentence transformer model
+        backend: Inference backend, one of "torch", "onnx" or "openvino"
+        model_kwargs: Extra arguments used to load the model (e.g. ONNX file name or provider)
+        torch_dtype: Precision of the weights with the torch backend (e.g. "bfloat16"), ignored otherwise
+        batch_size: Number of documents embedded in each forward pass of the model
+
+    Returns:
+        Document embedder producing normalized embeddings
+    """
+    return _maybe_compile(SentenceTransformersDocumentEmbedder(
+        **_embedder_kwargs(model, backend, model_kwargs, torch_dtype),
+        batch_size=batch_size
+    ))
+
+def create_text_embedder(
+    model: str = "sentence-transformers/all-MiniLM-L6-v2",
+    backend: str = "onnx",
+    model_kwargs: Optional[Dict[str, Any]] = None,
+    torch_dtype: Optional[str] = None
+) -> SentenceTransformersTextEmbedder:
+    """
+    Create the query embedder of the RAG pipeline.
+
+    Args:
+        model: Name of the sentence transformer model
+        backend: Inference backend, one of "torch", "onnx" or "openvino"
+        model_kwargs: Extra arguments used to load the model (e.g. ONNX file name or provider)
+        torch_dtype: Precision of the weights with the torch backend (e.g. "bfloat16"), ignored otherwise
+
+    Returns:
+        Text embedder producing normalized embeddings
+    """
+    return _maybe_compile(SentenceTransformersTextEmbedder(
+        **_embedder_kwargs(model, backend, model_kwargs, torch_dtype),
+        progress_bar=False  # A progress bar per query costs more than tokenizing the query
+    ))
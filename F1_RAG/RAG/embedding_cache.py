@@ -0,0 +1,195 @@
+"""
+Embedding Cache Module
+
+This module provides a disk cache of document embeddings for the indexing pipeline.
+Embeddings are deterministic given the embedder settings and the document content, so
+documents indexed by a previous run are not embedded again: their embedding is read from
+the cache, and only new or modified documents go through the embedder.
+
+The embeddings are stored as float32 blobs in a single SQLite database, keyed by the
+BLAKE2b hash of the embedder settings and the document content. Each batch of documents
+is looked up with one query and cached with one transaction, instead of opening a file
+per document.
+
+Components:
+- EmbeddingCache: Disk cache of embeddings keyed by content hash
+- EmbeddingCacheLookup: Pipeline component splitting documents into cached and missing ones
+- EmbeddingCacheWriter: Pipeline component caching new embeddings and merging both lists back
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from haystack import Document, component
+
+logger = logging.getLogger("F1_RAG.RAG.embedding_cache")
+
+# SQLite limits the number of parameters of a query (999 before SQLite 3.32)
+SQLITE_MAX_PARAMETERS = 999
+
+class EmbeddingCache:
+    """Disk cache of document embeddings keyed by embedder settings and content."""
+
+    def __init__(self, path: Union[str, Path], namespace: str):
+        """
+        Initialize the cache, creating its database on first use.
+
+        Args:
+            path: SQLite database file holding the cached embeddings
+            namespace: Embedder settings the embeddings depend on (e.g. model and backend)
+        """
+        self.path = Path(path)
+        self.namespace = namespace
+        self._connection: Optional[sqlite3.Connection] = None
+        # The indexing pipeline runs batches in several threads sharing the connection
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the database connection, opening it and creating the table if needed."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            # Readers of the database are not blocked while a batch is written
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, embedding BLOB NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _key(self, content: str) -> bytes:
+        return hashlib.blake2b(f"{self.namespace}\0{content}".encode("utf-8"), digest_size=16).digest()
+
+    def get(self, content: str) -> Optional[List[float]]:
+        """
+        Return the cached embedding of a document content.
+
+        Args:
+            content: Document content
+
+        Returns:
+            Cached embedding or None on a cache miss
+        """
+        return self.get_many([content])[0]
+
+    def get_many(self, contents: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Return the cached embeddings of several document contents.
+
+        Args:
+            contents: Document contents
+
+        Returns:
+            Cached embedding of each content, None for cache misses
+        """
+        keys = [self._key(content) for content in contents]
+        found = {}
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(keys), SQLITE_MAX_PARAMETERS):
+                chunk = keys[start:start + SQLITE_MAX_PARAMETERS]
+                rows = connection.execute(
+                    f"SELECT key, embedding FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                found.update(rows)
+        return [
+            np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+            for key in keys
+        ]
+
+    def put(self, content: str, embedding: List[float]) -> None:
+        """
+        Cache the embedding of a document content.
+
+        Args:
+            content: Document content
+            embedding: Embedding of the content
+        """
+        self.put_many([(content, embedding)])
+
+    def put_many(self, items: Sequence[Tuple[str, List[float]]]) -> None:
+        """
+        Cache the embeddings of several document contents in a single transaction.
+
+        Args:
+            items: Pairs of document content and embedding
+        """
+        rows = [
+            (self._key(content), np.asarray(embedding, dtype=np.float32).tobytes())
+            for content, embedding in items
+        ]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", rows)
+
+    def close(self) -> None:
+        """Close the database connection, reopened on next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+@component
+class EmbeddingCacheLookup:
+    """Attach cached embeddings to documents, and route the others to the embedder."""
+
+    def __init__(self, cache: EmbeddingCache):
+        self.cache = cache
+
+    @component.output_types(cached=List[Document], missing=List[Document])
+    def run(self, documents: List[Document]):
+        """
+        Split documents into those with a cached embedding and those to embed.
+
+        Args:
+            documents: Converted documents
+
+        Returns:
+            Dictionary with the documents with their cached embedding under "cached",
+            and the documents to embed under "missing"
+        """
+        cached, missing = [], []
+        embeddings = self.cache.get_many([document.content or "" for document in documents])
+        for document, embedding in zip(documents, embeddings):
+            if embedding is None:
+                missing.append(document)
+            else:
+                cached.append(replace(document, embedding=embedding))
+        logger.debug(f"Embedding cache: {len(cached)} hits, {len(missing)} misses")
+        return {"cached": cached, "missing": missing}
+
+@component
+class EmbeddingCacheWriter:
+    """Cache the embeddings computed by the embedder and merge them with the cached ones."""
+
+    def __init__(self, cache: EmbeddingCache):
+        self.cache = cache
+
+    @component.output_types(documents=List[Document])
+    def run(self, embedded: List[Document], cached: List[Document]):
+        """
+        Cache the new embeddings and return all documents.
+
+        Args:
+            embedded: Documents embedded by the embedder
+            cached: Documents with a cached embedding
+
+        Returns:
+            Dictionary with all the embedded documents under "documents"
+        """
+        self.cache.put_many([
+            (document.content or "", document.embedding)
+            for document in embedded
+            if document.embedding is not None
+        ])
+        return {"documents": cached + embedded}
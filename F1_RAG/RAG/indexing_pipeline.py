@@ -5,7 +5,8 @@ This module provides functionality to create and configure document indexing pip
 using Haystack components. The pipeline processes text documents by:
 
 1. Converting text files to document objects
-2. Generating embeddings using sentence transformers
+2. Generating embeddings using sentence transformers, reusing the embeddings cached on
+   disk by previous runs for unchanged documents if an embedding cache is configured
 3. Writing processed documents to a document store
 
 The module uses configuration from environment variables including:
@@ -13,26 +14,36 @@ The module uses configuration from environment variables including:
 
 Components:
 - TextFileToDocument: Converts raw text files to Haystack document objects
-- SentenceTransformersDocumentEmbedder: Generates document embeddings
+- EmbeddingCacheLookup: Attaches cached embeddings and routes the other documents to the embedder
+- SentenceTransformersDocumentEmbedder: Generates normalized document embeddings (ONNX Runtime backend by default)
+- EmbeddingCacheWriter: Caches the new embeddings and merges them with the cached ones
 - DocumentWriter: Writes processed documents to document store
 
 The pipeline can optionally generate a visualization of its structure.
 """
 
 import logging
+from typing import Any, Dict, Optional
 
 from haystack import Pipeline
-from haystack.document_stores.in_memory import InMemoryDocumentStore
+from haystack.document_stores.types import DocumentStore
 from haystack.components.converters import TextFileToDocument
-from haystack.components.embedders import SentenceTransformersDocumentEmbedder
 from haystack.components.writers import DocumentWriter
 
+from F1_RAG.RAG.embedders import create_document_embedder
+from F1_RAG.RAG.embedding_cache import EmbeddingCache, EmbeddingCacheLookup, EmbeddingCacheWriter
+
 # Configure logging
 logger = logging.getLogger("F1_RAG.RAG.indexing_pipeline")
 
 def create_indexing_pipeline(
-    document_store: InMemoryDocumentStore,
-    model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    document_store: DocumentStore,
+    model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+    embedder_backend: str = "onnx",
+    embedder_model_kwargs: Optional[Dict[str, Any]] = None,
+    embedder_torch_dtype: Optional[str] = None,
+    embedding_cache_path: Optional[str] = None,
+    embedder_batch_size: int = 32
 ) -> Pipeline:
     """
     Create indexing pipeline for document processing.
@@ -40,6 +51,11 @@ def create_indexing_pipeline(
     Args:
         document_store: Document store instance
         model_name: Name of the embedding model
+        embedder_backend: Inference backend of the embedding model ("torch", "onnx" or "openvino")
+        embedder_model_kwargs: Extra arguments used to load the embedding model
+        embedder_torch_dtype: Precision of the embedding model weights with the torch backend
+        embedding_cache_path: SQLite database caching document embeddings across runs, None to disable
+        embedder_batch_size: Number of documents embedded in each forward pass of the model
         
     Returns:
         Configured indexing pipeline
@@ -53,8 +69,22 @@ def create_indexing_pipeline(
         # Initialize pipeline components
         try:
             text_converter = TextFileToDocument()
-            embedder = SentenceTransformersDocumentEmbedder(model=model_name)
+            embedder = create_document_embedder(
+                model=model_name,
+                backend=embedder_backend,
+                model_kwargs=embedder_model_kwargs,
+                torch_dtype=embedder_torch_dtype,
+                batch_size=embedder_batch_size
+            )
             writer = DocumentWriter(document_store=document_store)
+            if embedding_cache_path is not None:
+                # Cached embeddings are only valid for the exact same embedder settings
+                cache = EmbeddingCache(
+                    embedding_cache_path,
+                    namespace=f"{model_name}|{embedder_backend}|{embedder.model_kwargs}"
+                )
+                cache_lookup = EmbeddingCacheLookup(cache)
+                cache_writer = EmbeddingCacheWriter(cache)
         except Exception as e:
             logger.error(f"Failed to initialize pipeline components: {str(e)}")
             raise RuntimeError(f"Pipeline component initialization failed: {str(e)}")
@@ -67,8 +97,17 @@ def create_indexing_pipeline(
             indexing_pipeline.add_component("writer", writer)
 
             # Connect components
-            indexing_pipeline.connect("converter", "embedder")
-            indexing_pipeline.connect("embedder", "writer")
+            if embedding_cache_path is None:
+                indexing_pipeline.connect("converter", "embedder")
+                indexing_pipeline.connect("embedder", "writer")
+            else:
+                indexing_pipeline.add_component("cache_lookup", cache_lookup)
+                indexing_pipeline.add_component("cache_writer", cache_writer)
+                indexing_pipeline.connect("converter", "cache_lookup")
+                indexing_pipeline.connect("cache_lookup.missing", "embedder")
+                indexing_pipeline.connect("embedder", "cache_writer.embedded")
+                indexing_pipeline.connect("cache_lookup.cached", "cache_writer.cached")
+                indexing_pipeline.connect("cache_writer", "writer")
         except Exception as e:
             logger.error(f"Failed to create pipeline: {str(e)}")
             raise RuntimeError(f"Unexpected error creating indexing pipeline: {str(e)}")
@@ -2,10 +2,14 @@
 Main Module for F1 RAG System
 
 This module orchestrates the complete RAG system workflow:
-1. Creates document store and indexing pipeline
-2. Processes and indexes documents from a directory
-3. Creates and configures RAG pipeline for querying
-4. Provides interface for asking questions
+1. Creates document store, searched exactly for small corpora and through an
+   approximate index otherwise, and indexing pipeline
+2. Processes and indexes documents from a directory, or loads the index saved
+   by a previous run if the documents did not change
+3. Creates and configures RAG pipeline for querying, loading the embedding model
+   while the saved index is loaded
+4. Provides interface for asking questions, one at a time, concurrently, or in
+   batches embedded in a single forward pass
 
 The module uses components from:
 - indexing_pipeline.py: For document processing and indexing
@@ -16,24 +20,52 @@ Note: The LLM model must be available on the Hugging Face Serverless Inference A
 See https://huggingface.co/inference-api for available models.
 """
 
+import asyncio
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
-from haystack.document_stores.in_memory import InMemoryDocumentStore
+from F1_RAG.RAG.document_store import create_document_store, select_index_string
+from F1_RAG.RAG.embedders import embed_texts
 from F1_RAG.RAG.indexing_pipeline import create_indexing_pipeline
-from F1_RAG.RAG.document_processor import get_documents_from_directory, index_documents
+from F1_RAG.RAG.document_processor import corpus_fingerprint, get_documents_from_directory, index_documents
 from F1_RAG.RAG.RAG_pipeline import create_rag_pipeline
+from F1_RAG.RAG.query_cache import SemanticQueryCache
 from F1_RAG.RAG.config.config import (
     prompt,
     DEFAULT_EMBEDDER_MODEL,
     DEFAULT_LLM_MODEL,
+    DEFAULT_EMBEDDING_DIM,
+    DEFAULT_EMBEDDER_BACKEND,
+    DEFAULT_EMBEDDER_MODEL_KWARGS,
+    DEFAULT_EMBEDDER_TORCH_DTYPE,
+    DEFAULT_INDEX_STRING,
+    DEFAULT_HNSW_EF_CONSTRUCTION,
+    DEFAULT_HNSW_EF_SEARCH,
+    DEFAULT_INDEX_TRAIN_SIZE,
+    DEFAULT_IVF_NPROBE,
+    DEFAULT_EXACT_SEARCH_MAX_DOCUMENTS,
+    DEFAULT_DOCUMENT_STORE,
+    DEFAULT_MATRIX_EMBEDDINGS_PATH,
+    DEFAULT_INDEX_PATH,
     DEFAULT_BATCH_SIZE,
-    DEFAULT_TOP_K
+    DEFAULT_EMBEDDER_BATCH_SIZE,
+    DEFAULT_INDEXING_WORKERS,
+    DEFAULT_READ_WORKERS,
+    DEFAULT_EMBEDDING_CACHE_PATH,
+    DEFAULT_TOP_K,
+    DEFAULT_CACHE_THRESHOLD,
+    DEFAULT_CACHE_MAX_SIZE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_HTTP_MAX_CONNECTIONS,
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+    DEFAULT_HTTP_RETRIES
 )
 from F1_RAG.config.logging_config import setup_logging
+from F1_RAG.config.runtime import configure_http_client, configure_runtime
 
 # Configure logging
 setup_logging()
@@ -42,13 +74,24 @@ logger = logging.getLogger("F1_RAG.RAG.main")
 # Load environment variables from .env file
 load_dotenv()
 
+# Configure the number of threads used to compute embeddings
+configure_runtime()
+
+# Keep the connections to the LLM API open between queries
+configure_http_client(
+    max_connections=DEFAULT_HTTP_MAX_CONNECTIONS,
+    keepalive_expiry=DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+    retries=DEFAULT_HTTP_RETRIES
+)
+
 class RAGSystem:
     def __init__(
         self,
         docs_dir: str,
         embedder_model: str = DEFAULT_EMBEDDER_MODEL,
         llm_model: str = DEFAULT_LLM_MODEL,
-        batch_size: int = DEFAULT_BATCH_SIZE
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        index_path: Optional[str] = DEFAULT_INDEX_PATH
     ):
         """
         Initialize RAG system with configuration parameters.
@@ -58,13 +101,27 @@ class RAGSystem:
             embedder_model: Model name for embeddings
             llm_model: Model name for LLM (must be available on HF Serverless Inference API)
             batch_size: Batch size for document processing
+            index_path: Path where the index is saved and reloaded from, None to always re-index
         """
         self.docs_dir = Path(docs_dir)
         self.embedder_model = embedder_model
         self.llm_model = llm_model
         self.batch_size = batch_size
-        self.document_store = InMemoryDocumentStore()
+        self.index_path = index_path
+        # Both embedders are created with the same settings, so that the model is only
+        # loaded once and shared by the indexing and RAG pipelines
+        self.embedder_settings: Dict[str, Any] = {
+            "embedder_backend": DEFAULT_EMBEDDER_BACKEND,
+            "embedder_model_kwargs": DEFAULT_EMBEDDER_MODEL_KWARGS,
+            "embedder_torch_dtype": DEFAULT_EMBEDDER_TORCH_DTYPE
+        }
+        self.document_store = None  # Created once the corpus size is known
         self.rag_pipeline = None
+        self.query_cache = SemanticQueryCache(
+            threshold=DEFAULT_CACHE_THRESHOLD,
+            max_size=DEFAULT_CACHE_MAX_SIZE,
+            ttl=DEFAULT_CACHE_TTL
+        )
 
     def initialize(self) -> None:
         """
@@ -78,28 +135,73 @@ class RAGSystem:
         try:
             logger.info("Initializing RAG system...")
             
-            # Create and run indexing pipeline
-            indexing_pipeline = create_indexing_pipeline(
-                document_store=self.document_store,
-                model_name=self.embedder_model
-            )
-            
             # Get and process documents
             documents = get_documents_from_directory(self.docs_dir)
             if not documents:
                 logger.warning("No documents found to index")
                 return
-                
-            index_documents(indexing_pipeline, documents, self.batch_size)
-            
-            # Create RAG pipeline
-            self.rag_pipeline = create_rag_pipeline(
-                embedder_model=self.embedder_model,
-                llm_model=self.llm_model,
-                document_store=self.document_store,
-                prompt_template=prompt,
-                top_k=DEFAULT_TOP_K
+            
+            index_string = select_index_string(
+                len(documents),
+                index_string=DEFAULT_INDEX_STRING,
+                exact_search_max_documents=DEFAULT_EXACT_SEARCH_MAX_DOCUMENTS
+            )
+            self.document_store = create_document_store(
+                embedding_dim=DEFAULT_EMBEDDING_DIM,
+                index_string=index_string,
+                ef_construction=DEFAULT_HNSW_EF_CONSTRUCTION,
+                ef_search=DEFAULT_HNSW_EF_SEARCH,
+                train_size=DEFAULT_INDEX_TRAIN_SIZE,
+                nprobe=DEFAULT_IVF_NPROBE,
+                store_type=DEFAULT_DOCUMENT_STORE,
+                embeddings_path=DEFAULT_MATRIX_EMBEDDINGS_PATH
             )
+            # The saved index is only reused by a store of the same type and index
+            store_layout = index_string if DEFAULT_DOCUMENT_STORE == "faiss" else DEFAULT_DOCUMENT_STORE
+            
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # Load the embedding model and create the LLM client while the saved index is loaded
+                rag_pipeline_future = executor.submit(
+                    create_rag_pipeline,
+                    embedder_model=self.embedder_model,
+                    llm_model=self.llm_model,
+                    document_store=self.document_store,
+                    prompt_template=prompt,
+                    top_k=DEFAULT_TOP_K,
+                    **self.embedder_settings
+                )
+                
+                fingerprint = corpus_fingerprint(documents, self.embedder_model, store_layout)
+                if self.index_path and self.document_store.load_if_current(self.index_path, fingerprint):
+                    logger.info("Documents unchanged, skipping indexing")
+                else:
+                    # The document embedder reuses the model loaded by the query embedder:
+                    # wait for it, so that both do not load the model at the same time
+                    rag_pipeline_future.result()
+                    
+                    # Create and run indexing pipeline
+                    indexing_pipeline = create_indexing_pipeline(
+                        document_store=self.document_store,
+                        model_name=self.embedder_model,
+                        **self.embedder_settings,
+                        embedding_cache_path=DEFAULT_EMBEDDING_CACHE_PATH,
+                        embedder_batch_size=DEFAULT_EMBEDDER_BATCH_SIZE
+                    )
+                    index_documents(
+                        indexing_pipeline,
+                        documents,
+                        self.batch_size,
+                        max_workers=DEFAULT_INDEXING_WORKERS,
+                        read_workers=DEFAULT_READ_WORKERS
+                    )
+                    # Index the remaining embeddings if the index is trained on fewer than were written
+                    self.document_store.train_index()
+                    if self.index_path:
+                        self.document_store.save(self.index_path, fingerprint=fingerprint)
+                
+                self.rag_pipeline = rag_pipeline_future.result()
+            # Warm up components so the query embedder can be run on its own for cache lookups
+            self.rag_pipeline.warm_up()
             
             logger.info("RAG system initialized successfully")
             
@@ -111,6 +213,10 @@ class RAGSystem:
         """
         Query the RAG system with a question.
         
+        Replies to questions asked before are served from the query cache without
+        calling the LLM: a repeated question is found by its text, without being
+        embedded, and a similar question by its embedding.
+        
         Args:
             question: Question to ask the system
             
@@ -125,24 +231,165 @@ class RAGSystem:
             
         try:
             logger.info(f"Processing question: {question}")
-            result = self.rag_pipeline.run(
-                data={
-                    "query_embedder": {"text": question},
-                    "prompt_builder": {"query": question}
-                }
-            )
-            # Extract and return only the replies
-            replies = result.get("generator", {}).get("replies", [])
-            if replies:
-                return replies[0]  # Return the first reply
-            else:
-                logger.warning("No replies generated.")
-                return None
+            cached_reply = self.query_cache.lookup_text(question)
+            if cached_reply is not None:
+                logger.info("Returning cached reply")
+                return cached_reply
+
+            # The embedding used for the cache lookup is passed on to the retriever
+            return self._answer(question, self._embed_query(question))
+                
+        except Exception as e:
+            logger.error(f"Error processing question: {str(e)}")
+            return None
+
+    async def aquery(self, question: str) -> Optional[str]:
+        """
+        Query the RAG system with a question without blocking the event loop.
+        
+        The question is embedded in a worker thread, and the embedding is passed on to
+        the retriever. The retrieval and the LLM call are awaited, or run in a worker
+        thread when a component has no async run, so several questions can be in
+        flight at the same time.
+        
+        Args:
+            question: Question to ask the system
+            
+        Returns:
+            Generated answer or None if processing fails
+            
+        Raises:
+            RuntimeError: If RAG pipeline is not initialized
+        """
+        if not self.rag_pipeline:
+            raise RuntimeError("RAG pipeline not initialized. Call initialize() first.")
+            
+        try:
+            logger.info(f"Processing question: {question}")
+            cached_reply = self.query_cache.lookup_text(question)
+            if cached_reply is None:
+                query_embedding = await asyncio.to_thread(self._embed_query, question)
+                cached_reply = self.query_cache.lookup(query_embedding)
+            if cached_reply is not None:
+                logger.info("Returning cached reply")
+                return cached_reply
+
+            retriever = self.rag_pipeline.get_component("retriever")
+            prompt_builder = self.rag_pipeline.get_component("prompt_builder")
+            generator = self.rag_pipeline.get_component("generator")
+            
+            documents = (await self._run_async(retriever, query_embedding=query_embedding))["documents"]
+            prompt = prompt_builder.run(query=question, documents=documents)["prompt"]
+            result = {"generator": await self._run_async(generator, prompt=prompt)}
+            return self._extract_reply(result, question, query_embedding)
                 
         except Exception as e:
             logger.error(f"Error processing question: {str(e)}")
             return None
 
+    async def aquery_batch(self, questions: List[str]) -> List[Optional[str]]:
+        """
+        Query the RAG system with several questions concurrently.
+        
+        Args:
+            questions: Questions to ask the system
+            
+        Returns:
+            Generated answers in the order of the questions, None for failed ones
+            
+        Raises:
+            RuntimeError: If RAG pipeline is not initialized
+        """
+        return await asyncio.gather(*(self.aquery(question) for question in questions))
+
+    def query_batch(self, questions: List[str]) -> List[Optional[str]]:
+        """
+        Query the RAG system with several questions, embedding them all at once.
+        
+        Embedding the questions in one batch makes better use of the embedder than
+        embedding them one by one. Questions asked before verbatim are not embedded,
+        and those missing from the query cache are answered one after the other.
+        
+        Args:
+            questions: Questions to ask the system
+            
+        Returns:
+            Generated answers in the order of the questions, None for failed ones
+            
+        Raises:
+            RuntimeError: If RAG pipeline is not initialized
+        """
+        if not self.rag_pipeline:
+            raise RuntimeError("RAG pipeline not initialized. Call initialize() first.")
+        if not questions:
+            return []
+            
+        logger.info(f"Processing {len(questions)} questions")
+        answers = [self.query_cache.lookup_text(question) for question in questions]
+        pending = [i for i, answer in enumerate(answers) if answer is None]
+        if not pending:
+            return answers
+            
+        try:
+            query_embedder = self.rag_pipeline.get_component("query_embedder")
+            query_embeddings = embed_texts(query_embedder, [questions[i] for i in pending])
+        except Exception as e:
+            logger.error(f"Error embedding questions: {str(e)}")
+            return answers
+        
+        for i, query_embedding in zip(pending, query_embeddings):
+            answers[i] = self._answer(questions[i], query_embedding)
+        return answers
+
+    def _answer(self, question: str, query_embedding: List[float]) -> Optional[str]:
+        """Answer an already embedded question, running the pipeline components after the embedder."""
+        cached_reply = self.query_cache.lookup(query_embedding)
+        if cached_reply is not None:
+            logger.info("Returning cached reply")
+            return cached_reply
+        
+        try:
+            retriever = self.rag_pipeline.get_component("retriever")
+            prompt_builder = self.rag_pipeline.get_component("prompt_builder")
+            generator = self.rag_pipeline.get_component("generator")
+            
+            documents = retriever.run(query_embedding=query_embedding)["documents"]
+            prompt = prompt_builder.run(query=question, documents=documents)["prompt"]
+            result = {"generator": generator.run(prompt=prompt)}
+            return self._extract_reply(result, question, query_embedding)
+            
+        except Exception as e:
+            logger.error(f"Error processing question: {str(e)}")
+            return None
+
+    @staticmethod
+    async def _run_async(component: Any, **inputs: Any) -> Dict[str, Any]:
+        """Run a pipeline component without blocking the event loop, in a worker thread if it has no async run."""
+        run_async = getattr(component, "run_async", None)
+        if run_async is not None:
+            return await run_async(**inputs)
+        return await asyncio.to_thread(component.run, **inputs)
+
+    def _extract_reply(
+        self,
+        result: Dict[str, Any],
+        question: str,
+        query_embedding: List[float]
+    ) -> Optional[str]:
+        """Extract the first reply from the pipeline result and cache it."""
+        replies = result.get("generator", {}).get("replies", [])
+        if replies:
+            self.query_cache.add(query_embedding, replies[0], text=question)
+            return replies[0]  # Return the first reply
+        else:
+            logger.warning("No replies generated.")
+            return None
+
+    def _embed_query(self, question: str) -> List[float]:
+        """Embed a question with the RAG pipeline's query embedder."""
+        query_embedder = self.rag_pipeline.get_component("query_embedder")
+        return query_embedder.run(text=question)["embedding"]
+
 def main():
     """Main function to demonstrate RAG system usage."""
     try:
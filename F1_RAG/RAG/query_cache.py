@@ -0,0 +1,174 @@
+"""
+Semantic Query Cache Module
+
+This module provides an in-process cache of generated replies keyed by query embeddings.
+A question whose embedding is close enough (cosine similarity above a threshold) to a
+previously answered question is served from the cache, skipping the LLM call entirely.
+A question asked again verbatim is found by a hash of its text, before it is even embedded.
+
+Key components:
+- SemanticQueryCache: FAISS inner-product index over L2-normalized query embeddings,
+  with an exact-match table of question hashes, LRU eviction and optional time-to-live
+  for cached replies
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger("F1_RAG.RAG.query_cache")
+
+class SemanticQueryCache:
+    """Cache of generated replies looked up by query embedding similarity."""
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        max_size: int = 1024,
+        ttl: Optional[float] = None
+    ):
+        """
+        Initialize an empty semantic cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached reply to be returned
+            max_size: Maximum number of cached replies before the least recently used is evicted
+            ttl: Number of seconds a cached reply stays valid, None to keep replies until evicted
+
+        Raises:
+            ValueError: If any of the parameters is out of range
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in the range (0, 1]")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self._index = None  # Created on first insert, once the embedding dimension is known
+        # Entry id -> (reply, creation time, hash of the question text or None)
+        self._entries: "OrderedDict[int, Tuple[str, float, Optional[bytes]]]" = OrderedDict()
+        self._text_ids: Dict[bytes, int] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup_text(self, text: str) -> Optional[str]:
+        """
+        Return the cached reply of a previous query with the same text.
+
+        Case and whitespace are ignored. This lookup does not need the query embedding.
+
+        Args:
+            text: Text of the incoming query
+
+        Returns:
+            Cached reply or None on a cache miss
+        """
+        entry_id = self._text_ids.get(self._text_key(text))
+        if entry_id is None:
+            return None
+        reply = self._get(entry_id)
+        if reply is not None:
+            logger.debug("Exact cache hit")
+        return reply
+
+    def lookup(self, embedding: List[float]) -> Optional[str]:
+        """
+        Return the cached reply of the most similar previous query, if similar enough.
+
+        All the cached queries above the similarity threshold are searched, so that an
+        expired reply of the most similar one does not hide a valid reply of another.
+
+        Args:
+            embedding: Embedding of the incoming query
+
+        Returns:
+            Cached reply or None on a cache miss
+        """
+        if self._index is None or self._index.ntotal == 0:
+            return None
+
+        # Range search only returns scores strictly above the radius
+        radius = float(np.nextafter(np.float32(self.threshold), np.float32(0)))
+        _, scores, ids = self._index.range_search(self._normalize(embedding), radius)
+        for i in np.argsort(-scores, kind="stable"):
+            reply = self._get(int(ids[i]))
+            if reply is not None:
+                logger.debug(f"Semantic cache hit (similarity: {float(scores[i]):.3f})")
+                return reply
+        return None
+
+    def add(self, embedding: List[float], reply: str, text: Optional[str] = None) -> None:
+        """
+        Store a reply for a query embedding, evicting the least recently used entry if full.
+
+        Args:
+            embedding: Embedding of the answered query
+            reply: Generated reply to cache
+            text: Text of the answered query, to find the reply by exact match
+
+        Raises:
+            ValueError: If the embedding dimension differs from the cached embeddings
+        """
+        vector = self._normalize(embedding)
+        if self._index is None:
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+        elif vector.shape[1] != self._index.d:
+            raise ValueError(
+                f"Embedding dimension {vector.shape[1]} does not match cache dimension {self._index.d}"
+            )
+
+        while len(self._entries) >= self.max_size:
+            self._evict(next(iter(self._entries)))
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+        text_key = None if text is None else self._text_key(text)
+        self._entries[entry_id] = (reply, time.monotonic(), text_key)
+        if text_key is not None:
+            self._text_ids[text_key] = entry_id
+
+    def clear(self) -> None:
+        """Remove all cached replies."""
+        self._index = None
+        self._entries.clear()
+        self._text_ids.clear()
+
+    def _get(self, entry_id: int) -> Optional[str]:
+        """Return the reply of an entry and mark it as recently used, or None if it expired."""
+        reply, created_at, _ = self._entries[entry_id]
+        if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+            logger.debug("Cached reply expired, evicting it")
+            self._evict(entry_id)
+            return None
+
+        self._entries.move_to_end(entry_id)
+        return reply
+
+    def _evict(self, entry_id: int) -> None:
+        self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+        _, _, text_key = self._entries.pop(entry_id)
+        # The text may have been cached again under a newer entry
+        if text_key is not None and self._text_ids.get(text_key) == entry_id:
+            del self._text_ids[text_key]
+
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        return hashlib.sha256(" ".join(text.casefold().split()).encode("utf-8")).digest()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
@@ -0,0 +1,195 @@
+"""
+Retrievers Module
+
+This module provides a faster replacement for InMemoryEmbeddingRetriever, used when the
+knowledge base is kept in a MatrixDocumentStore.
+
+The in-memory store rebuilds an embedding array from every Document on each query.
+NumbaEmbeddingRetriever instead scores the contiguous float32 matrix the MatrixDocumentStore
+keeps up to date on every write and delete, with a parallel Numba kernel computing the inner
+products, then keeps the top-k documents in a single pass over the scores. Numba is
+optional: without it, the matrix is scored with NumPy.
+
+Components:
+- NumbaEmbeddingRetriever: Embedding retriever over the (N, d) embedding matrix of a MatrixDocumentStore
+"""
+
+import logging
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from haystack import Document, component
+from haystack.components.retrievers.in_memory import InMemoryEmbeddingRetriever
+from haystack.document_stores.types import FilterPolicy
+from haystack.utils import expit
+
+from F1_RAG.RAG.document_store import DOT_PRODUCT_SCALING_FACTOR, MatrixDocumentStore
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+logger = logging.getLogger("F1_RAG.RAG.retrievers")
+
+def _top_k_numpy(matrix: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the indices and inner products of the k rows of matrix closest to query."""
+    scores = matrix @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _top_k_inner_product(matrix, query, k):
+        n, d = matrix.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(d):
+                acc += matrix[i, j] * query[j]
+            scores[i] = acc
+
+        # Insertion into a sorted buffer of size k, k being small (1-10)
+        top_indices = np.full(k, -1, dtype=np.int64)
+        top_scores = np.full(k, -np.inf, dtype=np.float32)
+        for i in range(n):
+            score = scores[i]
+            if score > top_scores[k - 1]:
+                position = k - 1
+                while position > 0 and top_scores[position - 1] < score:
+                    top_scores[position] = top_scores[position - 1]
+                    top_indices[position] = top_indices[position - 1]
+                    position -= 1
+                top_scores[position] = score
+                top_indices[position] = i
+        return top_indices, top_scores
+else:
+    _top_k_inner_product = _top_k_numpy
+
+@component
+class NumbaEmbeddingRetriever(InMemoryEmbeddingRetriever):
+    """InMemoryEmbeddingRetriever scoring the contiguous embedding matrix of a MatrixDocumentStore."""
+
+    def __init__(
+        self,
+        document_store: MatrixDocumentStore,
+        filters: Optional[Dict[str, Any]] = None,
+        top_k: int = 10,
+        scale_score: bool = False,
+        return_embedding: bool = False,
+        filter_policy: FilterPolicy = FilterPolicy.REPLACE
+    ):
+        """
+        Initialize the retriever.
+
+        Args:
+            document_store: Document store keeping the embedding matrix
+            filters: Filters narrowing down the documents to search
+            top_k: Maximum number of documents to return
+            scale_score: Whether to scale the scores to the range [0, 1]
+            return_embedding: Whether to return the embeddings of the documents
+            filter_policy: How the runtime filters are combined with the initialization ones
+
+        Raises:
+            ValueError: If the document store does not keep an embedding matrix
+        """
+        if not isinstance(document_store, MatrixDocumentStore):
+            raise ValueError("NumbaEmbeddingRetriever requires a MatrixDocumentStore")
+        # The component decorator recreates the class, so zero-argument super() cannot be used
+        InMemoryEmbeddingRetriever.__init__(
+            self,
+            document_store=document_store,
+            filters=filters,
+            top_k=top_k,
+            scale_score=scale_score,
+            return_embedding=return_embedding,
+            filter_policy=filter_policy
+        )
+
+    def _scale(self, score: float) -> float:
+        if self.document_store.embedding_similarity_function == "cosine":
+            return (score + 1) / 2
+        return expit(score / DOT_PRODUCT_SCALING_FACTOR)
+
+    @component.output_types(documents=List[Document])
+    def run(
+        self,
+        query_embedding: List[float],
+        filters: Optional[Dict[str, Any]] = None,
+        top_k: Optional[int] = None,
+        scale_score: Optional[bool] = None,
+        return_embedding: Optional[bool] = None
+    ):
+        """
+        Retrieve the documents most similar to the query embedding.
+
+        Filtered queries are delegated to the document store.
+
+        Args:
+            query_embedding: Embedding of the query
+            filters: Filters narrowing down the documents to search
+            top_k: Maximum number of documents to return
+            scale_score: Whether to scale the scores to the range [0, 1]
+            return_embedding: Whether to return the embeddings of the documents
+
+        Returns:
+            Dictionary with the retrieved documents under "documents"
+        """
+        if filters or self.filters:
+            return InMemoryEmbeddingRetriever.run(
+                self,
+                query_embedding=query_embedding,
+                filters=filters,
+                top_k=top_k,
+                scale_score=scale_score,
+                return_embedding=return_embedding
+            )
+
+        top_k = self.top_k if top_k is None else top_k
+        scale_score = self.scale_score if scale_score is None else scale_score
+        return_embedding = self.return_embedding if return_embedding is None else return_embedding
+
+        matrix, documents = self.document_store.embedding_matrix()
+        if not documents or top_k < 1:
+            return {"documents": []}
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (matrix.shape[1],):
+            raise ValueError(
+                f"Query embedding dimension {query.shape} does not match document dimension {matrix.shape[1]}"
+            )
+        if self.document_store.embedding_similarity_function == "cosine":
+            norm = np.linalg.norm(query)
+            query = query / (norm if norm > 0 else 1.0)
+
+        indices, scores = _top_k_inner_product(matrix, query, min(top_k, len(documents)))
+        results = []
+        for index, score in zip(indices, scores):
+            score = float(score)
+            doc = documents[index]
+            embedding = None
+            if return_embedding:
+                # Documents loaded from disk keep their embedding in the matrix only
+                embedding = doc.embedding if doc.embedding is not None else matrix[index].tolist()
+            results.append(replace(doc, score=self._scale(score) if scale_score else score, embedding=embedding))
+        return {"documents": results}
+
+    @component.output_types(documents=List[Document])
+    async def run_async(
+        self,
+        query_embedding: List[float],
+        filters: Optional[Dict[str, Any]] = None,
+        top_k: Optional[int] = None,
+        scale_score: Optional[bool] = None,
+        return_embedding: Optional[bool] = None
+    ):
+        """Asynchronous version of run, the scoring being CPU-bound and in memory."""
+        return self.run(
+            query_embedding=query_embedding,
+            filters=filters,
+            top_k=top_k,
+            scale_score=scale_score,
+            return_embedding=return_embedding
+        )
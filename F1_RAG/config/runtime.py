@@ -0,0 +1,115 @@
+"""Runtime configuration of the numerical and HTTP libraries for F1 RAG system."""
+
+import logging
+import os
+
+logger = logging.getLogger("F1_RAG.config.runtime")
+
+def _available_cores() -> int:
+    """Number of cores this process may run on, honouring container CPU affinity."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def configure_runtime() -> int:
+    """
+    Set the number of threads used by PyTorch, FAISS and the BLAS/OpenMP libraries.
+
+    The thread count is read from the TORCH_NUM_THREADS environment variable and
+    defaults to the number of available cores. The libraries are already loaded when
+    this is called, so OMP_NUM_THREADS and MKL_NUM_THREADS would no longer be read:
+    the thread pools are resized through their APIs instead, and through threadpoolctl
+    for the BLAS libraries of NumPy when it is installed.
+
+    Returns:
+        Number of intra-op threads configured
+    """
+    num_threads = int(os.getenv("TORCH_NUM_THREADS") or _available_cores())
+
+    import faiss
+    import torch
+
+    torch.set_num_threads(num_threads)
+    try:
+        # Parallelism comes from intra-op threads, inter-op threads only add contention
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        logger.debug("Inter-op thread count already set, keeping it")
+    faiss.omp_set_num_threads(num_threads)
+
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        logger.debug("threadpoolctl is not installed, keeping the BLAS thread count")
+    else:
+        threadpool_limits(limits=num_threads, user_api="blas")
+
+    logger.info(f"Configured PyTorch and FAISS to use {num_threads} threads")
+    return num_threads
+
+def configure_http_client(max_connections: int = 16, keepalive_expiry: float = 60.0, retries: int = 3) -> bool:
+    """
+    Configure the HTTP connection pools used by huggingface_hub, and thus by the LLM generator.
+
+    huggingface_hub already shares one keep-alive client between requests, but idle connections
+    are closed after 5 seconds by default: with an interactive user asking a question every few
+    seconds, most queries would pay a new TCP and TLS handshake. Connections are kept longer,
+    and requests failing to connect are retried.
+
+    The clients are installed through the public set_client_factory and set_async_client_factory
+    of huggingface_hub. They need its request hooks, which block requests in offline mode and tag
+    them with request ids: these hooks are not public, so if they cannot be imported from this
+    huggingface_hub version, its default clients are kept rather than replaced by clients without them.
+
+    Args:
+        max_connections: Maximum number of connections, all of which may be kept alive
+        keepalive_expiry: Seconds an idle connection is kept open
+        retries: Number of retries of a request failing to connect
+
+    Returns:
+        True if the clients were configured, False if huggingface_hub does not support it
+    """
+    try:
+        import httpx
+        from huggingface_hub import set_async_client_factory, set_client_factory
+    except ImportError:
+        logger.debug("huggingface_hub does not use httpx, keeping its default HTTP client")
+        return False
+
+    try:
+        from huggingface_hub.utils._http import (
+            async_hf_request_event_hook,
+            async_hf_response_event_hook,
+            hf_request_event_hook
+        )
+    except ImportError:
+        logger.debug("huggingface_hub request hooks not found, keeping its default HTTP client")
+        return False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+
+    # Same settings as the huggingface_hub default clients, with a configured transport
+    def client_factory() -> httpx.Client:
+        return httpx.Client(
+            event_hooks={"request": [hf_request_event_hook]},
+            follow_redirects=True,
+            timeout=None,
+            transport=httpx.HTTPTransport(limits=limits, retries=retries)
+        )
+
+    def async_client_factory() -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            event_hooks={"request": [async_hf_request_event_hook], "response": [async_hf_response_event_hook]},
+            follow_redirects=True,
+            timeout=None,
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=retries)
+        )
+
+    set_client_factory(client_factory)
+    set_async_client_factory(async_client_factory)
+    logger.info(f"Configured HTTP clients with {max_connections} keep-alive connections")
+    return True
@@ -0,0 +1,78 @@
+"""
+Test module for the asynchronous Wikipedia fetching functions.
+
+This module contains unit tests for the extract requests and for the splitting
+of extracts into summary and full text.
+"""
+
+import asyncio
+import httpx
+import pytest
+from F1_RAG.wiki_downloader.async_fetch import create_client, fetch_extract, split_extract
+
+TEST_EXTRACT = (
+    "Lead paragraph.\n\n"
+    "== Report ==\n"
+    "Race report.\n\n"
+    "=== Qualifying ===\n"
+    "Qualifying report.\n\n"
+    "== References ==\n"
+)
+
+def run_fetch(handler, title="Test Article"):
+    """Helper function fetching an extract from a mock transport."""
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_extract(client, asyncio.Semaphore(1), title)
+    return asyncio.run(fetch())
+
+def test_create_client():
+    """Test that the client identifies itself with the user agent."""
+    client = create_client("F1_RAG tests")
+    assert client.headers["User-Agent"] == "F1_RAG tests"
+
+def test_split_extract():
+    """Test splitting an extract with nested and empty sections."""
+    summary, text = split_extract(TEST_EXTRACT)
+    assert summary == "Lead paragraph."
+    assert text == (
+        "Lead paragraph.\n\n"
+        "Report\nRace report.\n\n"
+        "Qualifying\nQualifying report.\n\n"
+        "References"
+    )
+
+def test_split_extract_without_sections():
+    """Test that an extract without sections is entirely summary."""
+    assert split_extract("  Only a lead.\n") == ("Only a lead.", "Only a lead.")
+
+def test_fetch_extract():
+    """Test the extract request and response parsing."""
+    def handler(request):
+        assert request.url.params["titles"] == "Test Article"
+        assert request.url.params["prop"] == "extracts"
+        return httpx.Response(200, json={"query": {"pages": [{"title": "Test Article", "extract": TEST_EXTRACT}]}})
+    
+    assert run_fetch(handler) == TEST_EXTRACT
+
+def test_fetch_extract_missing():
+    """Test that a missing article gives no extract."""
+    def handler(request):
+        return httpx.Response(200, json={"query": {"pages": [{"title": "Missing", "missing": True}]}})
+    
+    assert run_fetch(handler, "Missing") is None
+
+def test_fetch_extract_http_error():
+    """Test that HTTP errors are raised."""
+    with pytest.raises(httpx.HTTPStatusError):
+        run_fetch(lambda request: httpx.Response(503))
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(200, text="<html>Not JSON</html>"),
+    httpx.Response(200, json={"query": []}),
+    httpx.Response(200, json={"query": {"pages": [{"extract": None}]}}),
+])
+def test_fetch_extract_malformed_response(response):
+    """Test that unexpected responses are reported as ValueError."""
+    with pytest.raises(ValueError):
+        run_fetch(lambda request: response)
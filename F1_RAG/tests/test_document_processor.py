@@ -8,16 +8,20 @@ This module contains tests for the document processing functionality, including:
 - Error handling
 """
 
+import os
 import pytest
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from haystack import Pipeline
+from haystack.components.converters import TextFileToDocument
 
 from F1_RAG.RAG.document_processor import (
     validate_documents,
     process_batch,
     index_documents,
-    get_documents_from_directory
+    get_documents_from_directory,
+    corpus_fingerprint,
+    read_document
 )
 
 # Test fixtures
@@ -86,6 +90,103 @@ def test_index_documents_successful_batching(mock_pipeline, temp_directory):
     index_documents(mock_pipeline, files, batch_size=2)
     assert mock_pipeline.run.call_count == 2  # Should make 2 calls with batch_size=2
 
+def test_index_documents_single_run(mock_pipeline, temp_directory):
+    """Test that all documents go through a single pipeline run when they fit in one batch"""
+    files = [
+        temp_directory / "test1.txt",
+        temp_directory / "test2.txt",
+        temp_directory / "subdir" / "test3.txt"
+    ]
+    index_documents(mock_pipeline, files, batch_size=len(files))
+    assert mock_pipeline.run.call_count == 1
+    assert len(mock_pipeline.run.call_args.args[0]["sources"]) == 3
+
+def test_index_documents_batches_sorted_by_length(mock_pipeline, tmp_path):
+    files = []
+    for name, content in [("long.txt", "x" * 300), ("short.txt", "x"), ("medium.txt", "x" * 20)]:
+        file_path = tmp_path / name
+        file_path.write_text(content)
+        files.append(file_path)
+    
+    index_documents(mock_pipeline, files, batch_size=2, max_workers=1)
+    batches = [
+        [source.meta["file_path"] for source in call.args[0]["sources"]]
+        for call in mock_pipeline.run.call_args_list
+    ]
+    assert batches == [
+        [str(tmp_path / "short.txt"), str(tmp_path / "medium.txt")],
+        [str(tmp_path / "long.txt")]
+    ]
+
+def test_index_documents_stats_each_file_once(mock_pipeline, temp_directory):
+    files = [temp_directory / "test1.txt", temp_directory / "test2.txt"]
+    with patch('F1_RAG.RAG.document_processor.os.stat', wraps=os.stat) as mock_stat:
+        index_documents(mock_pipeline, files, batch_size=1)
+    stat_paths = [os.fspath(call.args[0]) for call in mock_stat.call_args_list]
+    assert all(stat_paths.count(str(f)) == 1 for f in files)
+
+def test_index_documents_reads_files(mock_pipeline, temp_directory):
+    """Test that the pipeline receives the file contents instead of paths"""
+    index_documents(mock_pipeline, [temp_directory / "test1.txt"], read_workers=2)
+    source = mock_pipeline.run.call_args.args[0]["sources"][0]
+    assert source.data == b"Test content 1"
+    assert source.meta == {"file_path": str(temp_directory / "test1.txt")}
+
+def test_index_documents_invalid_read_workers(mock_pipeline, temp_directory):
+    with pytest.raises(ValueError):
+        index_documents(mock_pipeline, [temp_directory / "test1.txt"], read_workers=0)
+
+def test_read_document_matches_converter(temp_directory):
+    """Test that converting a read document gives the same document as converting its path"""
+    path = str(temp_directory / "test1.txt")
+    converter = TextFileToDocument()
+    from_path = converter.run(sources=[path])["documents"][0]
+    from_memory = converter.run(sources=[read_document(path)])["documents"][0]
+    assert from_memory == from_path
+
+def test_read_document_sizes(tmp_path):
+    """Test that empty and large files are read entirely"""
+    for size in (0, 1, 200_000):
+        path = tmp_path / f"{size}.txt"
+        path.write_bytes(bytes(range(256)) * (size // 256) + b"x" * (size % 256))
+        assert read_document(str(path)).data == path.read_bytes()
+
+def test_read_document_single_read(tmp_path):
+    """Test that a file is read with a single read call"""
+    path = tmp_path / "single.txt"
+    path.write_bytes(b"w" * 100_000)
+    real_read = os.read
+    with patch('F1_RAG.RAG.document_processor.os.read', side_effect=real_read) as mock_read:
+        assert read_document(str(path)).data == b"w" * 100_000
+    assert mock_read.call_count == 1
+
+def test_read_document_grown_file(tmp_path):
+    """Test that a file larger than its size at fstat time is read to the end"""
+    path = tmp_path / "growing.txt"
+    path.write_bytes(b"y" * 100_000)
+    with patch('F1_RAG.RAG.document_processor.os.fstat', return_value=Mock(st_size=10)):
+        assert read_document(str(path)).data == b"y" * 100_000
+
+def test_read_document_short_reads(tmp_path):
+    """Test that a file returned by several short reads is read to the end"""
+    path = tmp_path / "short.txt"
+    path.write_bytes(b"z" * 100_000)
+    real_read = os.read
+    with patch('F1_RAG.RAG.document_processor.os.read',
+               side_effect=lambda fd, count: real_read(fd, min(count, 7_000))):
+        assert read_document(str(path)).data == b"z" * 100_000
+
+def test_index_documents_invalid_max_workers(mock_pipeline, temp_directory):
+    files = [temp_directory / "test1.txt"]
+    with pytest.raises(ValueError):
+        index_documents(mock_pipeline, files, max_workers=0)
+
+def test_index_documents_batch_failure(mock_pipeline, temp_directory):
+    mock_pipeline.run.side_effect = Exception("Pipeline error")
+    files = [temp_directory / "test1.txt", temp_directory / "test2.txt"]
+    with pytest.raises(RuntimeError):
+        index_documents(mock_pipeline, files, batch_size=1)
+
 # Test get_documents_from_directory
 def test_get_documents_from_directory_recursive(temp_directory):
     docs = get_documents_from_directory(temp_directory, pattern="*.txt")
@@ -106,3 +207,24 @@ def test_get_documents_from_directory_not_directory(temp_directory):
 def test_get_documents_from_directory_no_matches(temp_directory):
     docs = get_documents_from_directory(temp_directory, pattern="*.pdf")
     assert len(docs) == 0
+
+def test_get_documents_from_directory_files_only(temp_directory):
+    (temp_directory / "folder.txt").mkdir()
+    docs = get_documents_from_directory(temp_directory, pattern="*.txt")
+    assert all(isinstance(doc, Path) and doc.is_file() for doc in docs)
+    assert docs == sorted(docs)
+    assert len(docs) == 3
+
+# Test corpus_fingerprint
+def test_corpus_fingerprint_order_independent(temp_directory):
+    files = [temp_directory / "test1.txt", temp_directory / "test2.txt"]
+    assert corpus_fingerprint(files, "model") == corpus_fingerprint(files[::-1], "model")
+
+def test_corpus_fingerprint_changes(temp_directory):
+    files = [temp_directory / "test1.txt", temp_directory / "test2.txt"]
+    fingerprint = corpus_fingerprint(files, "model")
+    
+    assert corpus_fingerprint(files[:1], "model") != fingerprint
+    assert corpus_fingerprint(files, "other model") != fingerprint
+    (temp_directory / "test1.txt").write_text("Modified content 1")
+    assert corpus_fingerprint(files, "model") != fingerprint
@@ -0,0 +1,291 @@
+"""
+Tests for document_store.py focusing on index configuration and retrieval order
+"""
+
+import pytest
+import faiss
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from haystack import Document
+from haystack.document_stores.errors import DocumentStoreError
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+from haystack.document_stores.types import DuplicatePolicy
+from F1_RAG.RAG.document_store import HNSWDocumentStore, MatrixDocumentStore, create_document_store, select_index_string
+
+def random_documents(count, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [Document(content=f"doc {i}", embedding=rng.normal(size=dim).tolist()) for i in range(count)]
+
+@pytest.fixture
+def document_store():
+    return create_document_store(embedding_dim=3, ef_construction=100, ef_search=32)
+
+def test_hnsw_configuration(document_store):
+    """Test that the HNSW index uses inner product and the configured parameters"""
+    hnsw_index = faiss.downcast_index(document_store.index.index)
+    assert isinstance(document_store, HNSWDocumentStore)
+    assert hnsw_index.metric_type == faiss.METRIC_INNER_PRODUCT
+    assert hnsw_index.hnsw.efConstruction == 100
+    assert hnsw_index.hnsw.efSearch == 32
+
+def test_search_orders_by_similarity(document_store):
+    """Test that the most similar document is returned first with its cosine score"""
+    document_store.write_documents([
+        Document(content="Monaco", embedding=[1.0, 0.0, 0.0]),
+        Document(content="Monza", embedding=[0.0, 1.0, 0.0]),
+    ])
+    results = document_store.search([0.8, 0.6, 0.0], top_k=2)
+    assert [doc.content for doc in results] == ["Monaco", "Monza"]
+    assert results[0].score == pytest.approx(0.8)
+
+def test_concurrent_writes(document_store):
+    """Test that batches written from several threads are all indexed"""
+    batches = [
+        [Document(content=f"doc {i}-{j}", embedding=[1.0, float(i), float(j)]) for j in range(20)]
+        for i in range(8)
+    ]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(document_store.write_documents, batches))
+    assert document_store.count_documents() == 160
+    assert document_store.index.ntotal == 160
+
+def test_parameters_kept_after_reset(document_store):
+    """Test that recreating the index keeps the HNSW parameters"""
+    document_store.delete_all_documents()
+    hnsw_index = faiss.downcast_index(document_store.index.index)
+    assert hnsw_index.hnsw.efSearch == 32
+
+def test_float16_storage():
+    """Test that the vectors can be stored in half precision"""
+    document_store = create_document_store(embedding_dim=3, index_string="HNSW32_SQfp16", ef_search=32)
+    document_store.write_documents([Document(content="Monaco", embedding=[1.0, 0.0, 0.0])])
+    hnsw_index = faiss.downcast_index(document_store.index.index)
+    assert hnsw_index.hnsw.efSearch == 32
+    assert document_store.search([1.0, 0.0, 0.0], top_k=1)[0].score == pytest.approx(1.0, abs=1e-3)
+
+def test_trained_index():
+    """Test that writes are buffered until the index is trained, then searchable"""
+    document_store = create_document_store(embedding_dim=8, index_string="IVF4,PQ4x4", train_size=300, nprobe=4)
+    documents = random_documents(400)
+    
+    document_store.write_documents(documents[:200])
+    assert not document_store.index.is_trained
+    assert document_store.index.ntotal == 0
+    assert document_store.search(documents[0].embedding, top_k=1) == []
+    
+    document_store.write_documents(documents[200:350])
+    assert document_store.index.is_trained
+    assert document_store.index.ntotal == 350
+    assert faiss.extract_index_ivf(document_store.index.index).nprobe == 4
+    
+    document_store.write_documents(documents[350:])
+    assert document_store.index.ntotal == 400
+
+def test_pca_projection():
+    """Test that a PCA in front of the HNSW index is trained and keeps the HNSW parameters"""
+    document_store = create_document_store(
+        embedding_dim=8, index_string="PCA4,HNSW32", ef_search=48, train_size=100
+    )
+    # Normalized embeddings with a non-zero mean, spanning 4 of the 8 dimensions so the projection loses nothing
+    rng = np.random.default_rng(0)
+    embeddings = (rng.normal(size=(150, 4)) + 2.0) @ rng.normal(size=(4, 8))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    documents = [Document(content=f"doc {i}", embedding=embedding.tolist()) for i, embedding in enumerate(embeddings)]
+    document_store.write_documents(documents)
+    
+    pca_index = faiss.downcast_index(document_store.index.index)
+    assert isinstance(pca_index, faiss.IndexPreTransform)
+    assert pca_index.is_trained and pca_index.ntotal == 150
+    assert faiss.downcast_index(pca_index.index).hnsw.efSearch == 48
+    assert faiss.downcast_index(pca_index.index).d == 4
+    result = document_store.search(documents[7].embedding, top_k=1)[0]
+    assert result.content == "doc 7"
+    assert result.score == pytest.approx(1.0, abs=1e-4)
+
+def test_train_index_on_remainder():
+    """Test that documents deleted before training are not indexed"""
+    document_store = create_document_store(embedding_dim=8, index_string="IVF4,PQ4x4", train_size=1000)
+    documents = random_documents(100)
+    document_store.write_documents(documents)
+    document_store.delete_documents([documents[0].id])
+    
+    document_store.train_index()
+    assert document_store.index.ntotal == 99
+    assert all(doc.id != documents[0].id for doc in document_store.search(documents[0].embedding, top_k=5))
+
+def test_train_index_with_too_few_documents():
+    document_store = create_document_store(embedding_dim=8, index_string="IVF16,PQ4x4")
+    document_store.write_documents(random_documents(5))
+    with pytest.raises(DocumentStoreError):
+        document_store.train_index()
+
+def test_save_and_load_if_current(document_store, tmp_path):
+    """Test that a saved store is only loaded back for the same corpus fingerprint"""
+    index_path = tmp_path / "index" / "store"
+    document_store.write_documents([Document(content="Monaco", embedding=[1.0, 0.0, 0.0])])
+    document_store.save(index_path, fingerprint="abc")
+    
+    loaded_store = create_document_store(embedding_dim=3)
+    assert not loaded_store.load_if_current(index_path, "def")
+    assert loaded_store.count_documents() == 0
+    assert loaded_store.load_if_current(index_path, "abc")
+    assert loaded_store.search([1.0, 0.0, 0.0], top_k=1)[0].content == "Monaco"
+    assert not create_document_store(embedding_dim=3).load_if_current(tmp_path / "missing", "abc")
+
+def test_select_index_string():
+    """Test that small corpora get an exact index, larger ones the configured index"""
+    assert select_index_string(5000, "HNSW32", exact_search_max_documents=5000) == "Flat"
+    assert select_index_string(5001, "HNSW32", exact_search_max_documents=5000) == "HNSW32"
+    assert select_index_string(10, "HNSW32", exact_search_max_documents=0) == "HNSW32"
+
+def test_exact_index_search():
+    """Test that the flat index returns the exact nearest neighbours"""
+    documents = random_documents(50)
+    for doc in documents:
+        doc.embedding = (np.asarray(doc.embedding) / np.linalg.norm(doc.embedding)).tolist()
+    document_store = create_document_store(embedding_dim=8, index_string=select_index_string(50, "HNSW32", 100))
+    document_store.write_documents(documents)
+    
+    for doc in documents[:10]:
+        assert document_store.search(doc.embedding, top_k=1)[0].content == doc.content
+
+def test_exact_index_scores():
+    """Test that the flat index scores documents by inner product, decreasing down the ranking"""
+    documents = random_documents(50)
+    for doc in documents:
+        doc.embedding = (np.asarray(doc.embedding) / np.linalg.norm(doc.embedding)).tolist()
+    document_store = create_document_store(embedding_dim=8, index_string="Flat")
+    document_store.write_documents(documents)
+    
+    results = document_store.search(documents[0].embedding, top_k=10)
+    scores = [doc.score for doc in results]
+    assert results[0].content == documents[0].content
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert scores == sorted(scores, reverse=True)
+    assert document_store.search([-x for x in documents[0].embedding], top_k=50)[-1].score == \
+        pytest.approx(-1.0, abs=1e-5)
+
+def test_create_matrix_document_store(tmp_path):
+    """Test that the store type selects the matrix document store"""
+    document_store = create_document_store(store_type="matrix", embeddings_path=tmp_path / "embeddings.f32")
+    assert isinstance(document_store, MatrixDocumentStore)
+    assert document_store.embeddings_path == tmp_path / "embeddings.f32"
+    with pytest.raises(ValueError):
+        create_document_store(store_type="unknown")
+
+def test_invalid_index_string():
+    with pytest.raises(RuntimeError):
+        create_document_store(index_string="NotAnIndex")
+
+
+@pytest.mark.parametrize("similarity", ["dot_product", "cosine"])
+@pytest.mark.parametrize("scale_score", [False, True])
+def test_matrix_store_matches_in_memory_store(similarity, scale_score):
+    """Test that the matrix store returns the same documents and scores as the in-memory store"""
+    documents = random_documents(50)
+    matrix_store = MatrixDocumentStore(embedding_similarity_function=similarity)
+    in_memory_store = InMemoryDocumentStore(embedding_similarity_function=similarity)
+    matrix_store.write_documents(documents)
+    in_memory_store.write_documents(documents)
+    
+    query = np.random.default_rng(1).normal(size=8).tolist()
+    results = matrix_store.embedding_retrieval(query, top_k=5, scale_score=scale_score)
+    expected = in_memory_store.embedding_retrieval(query, top_k=5, scale_score=scale_score)
+    
+    assert [doc.id for doc in results] == [doc.id for doc in expected]
+    assert [doc.score for doc in results] == pytest.approx([doc.score for doc in expected], rel=1e-4)
+
+def test_matrix_store_grows(monkeypatch):
+    """Test that the matrix grows past its initial capacity and stays contiguous"""
+    monkeypatch.setattr('F1_RAG.RAG.document_store.MATRIX_GROWTH_ROWS', 4)
+    document_store = MatrixDocumentStore()
+    document_store.write_documents(random_documents(10))
+    
+    matrix, documents = document_store.embedding_matrix()
+    assert matrix.shape == (10, 8)
+    assert matrix.dtype == np.float32 and matrix.flags.c_contiguous
+    assert [doc.content for doc in documents] == [f"doc {i}" for i in range(10)]
+
+def test_matrix_store_memory_mapped(monkeypatch, tmp_path):
+    """Test that a memory-mapped matrix grows in its file and gives the same results"""
+    monkeypatch.setattr('F1_RAG.RAG.document_store.MATRIX_GROWTH_ROWS', 4)
+    embeddings_path = tmp_path / "index" / "embeddings.f32"
+    documents = random_documents(10)
+    mapped_store = MatrixDocumentStore(embeddings_path=embeddings_path)
+    in_memory_store = MatrixDocumentStore()
+    mapped_store.write_documents(documents)
+    in_memory_store.write_documents(documents)
+    
+    matrix, _ = mapped_store.embedding_matrix()
+    assert isinstance(matrix, np.memmap)
+    assert embeddings_path.stat().st_size == 12 * 8 * 4
+    assert np.array_equal(np.fromfile(embeddings_path, dtype=np.float32).reshape(12, 8)[:10], matrix)
+    
+    query = documents[3].embedding
+    assert [doc.id for doc in mapped_store.embedding_retrieval(query, top_k=3)] == \
+        [doc.id for doc in in_memory_store.embedding_retrieval(query, top_k=3)]
+
+@pytest.mark.parametrize("mapped", [True, False])
+def test_matrix_store_save_and_load_if_current(tmp_path, mapped):
+    """Test that a saved store is loaded back by mapping its embedding file, without rewriting it"""
+    embeddings_path = tmp_path / "index" / "embeddings.f32" if mapped else None
+    index_path = tmp_path / "index" / "f1_rag"
+    documents = random_documents(10) + [Document(content="no embedding")]
+    document_store = MatrixDocumentStore(embeddings_path=embeddings_path)
+    document_store.write_documents(documents)
+    document_store.save(index_path, fingerprint="v1")
+    saved_matrix = np.array(document_store.embedding_matrix()[0])
+    embeddings_file = embeddings_path or index_path.with_suffix(".f32")
+    saved_bytes = embeddings_file.read_bytes()
+    
+    reopened_store = MatrixDocumentStore()
+    assert not reopened_store.load_if_current(index_path, "v2")
+    assert reopened_store.load_if_current(index_path, "v1")
+    matrix, rows = reopened_store.embedding_matrix()
+    assert isinstance(matrix, np.memmap)
+    assert np.array_equal(matrix, saved_matrix)
+    assert [doc.id for doc in rows] == [doc.id for doc in documents[:10]]
+    assert reopened_store.count_documents() == 11
+    assert embeddings_file.read_bytes() == saved_bytes
+    
+    query = documents[3].embedding
+    expected = document_store.embedding_retrieval(query, top_k=3, return_embedding=True)
+    results = reopened_store.embedding_retrieval(query, top_k=3, return_embedding=True)
+    assert [doc.id for doc in results] == [doc.id for doc in expected]
+    assert [doc.score for doc in results] == pytest.approx([doc.score for doc in expected])
+    assert results[0].embedding == pytest.approx(saved_matrix[3].tolist())
+    
+    # Documents written after loading are appended to the mapped file
+    reopened_store.write_documents([Document(content="new", embedding=[1.0] * 8)])
+    assert reopened_store.embedding_retrieval([1.0] * 8, top_k=1)[0].content == "new"
+    assert embeddings_file.read_bytes()[:saved_matrix.nbytes] == saved_bytes[:saved_matrix.nbytes]
+
+def test_matrix_store_delete_and_overwrite():
+    """Test that deleted and overwritten documents are removed from the matrix"""
+    document_store = MatrixDocumentStore(embedding_similarity_function="dot_product")
+    documents = [Document(id=str(i), content=str(i), embedding=[float(i), 0.0]) for i in range(4)]
+    document_store.write_documents(documents)
+    
+    document_store.delete_documents(["1"])
+    document_store.write_documents(
+        [Document(id="2", content="new", embedding=[10.0, 0.0])], policy=DuplicatePolicy.OVERWRITE
+    )
+    document_store.write_documents([Document(id="3", content="skipped", embedding=[20.0, 0.0])], policy=DuplicatePolicy.SKIP)
+    
+    matrix, rows = document_store.embedding_matrix()
+    assert sorted(doc.content for doc in rows) == ["0", "3", "new"]
+    assert matrix.shape == (3, 2)
+    assert [doc.content for doc in document_store.embedding_retrieval([1.0, 0.0], top_k=3)] == ["new", "3", "0"]
+    
+    document_store.delete_all_documents()
+    assert document_store.embedding_retrieval([1.0, 0.0]) == []
+
+def test_matrix_store_filters():
+    """Test that filtered queries only return matching documents"""
+    document_store = MatrixDocumentStore()
+    document_store.write_documents(random_documents(5) + [
+        Document(content="monaco", meta={"race": "monaco"}, embedding=[1.0] * 8)
+    ])
+    filters = {"field": "meta.race", "operator": "==", "value": "monaco"}
+    results = document_store.embedding_retrieval([1.0] * 8, filters=filters)
+    assert [doc.content for doc in results] == ["monaco"]
@@ -0,0 +1,95 @@
+"""
+Tests for embedders.py focusing on the settings shared by both embedders
+"""
+
+import torch
+from unittest.mock import Mock, patch
+from F1_RAG.RAG.embedders import compile_embedder, create_document_embedder, create_text_embedder, embed_texts
+
+def test_default_backend():
+    """Test that embedders run on ONNX Runtime and normalize embeddings by default"""
+    for embedder in (create_document_embedder(), create_text_embedder()):
+        assert embedder.backend == "onnx"
+        assert embedder.normalize_embeddings is True
+
+def test_torch_dtype():
+    """Test that the weights precision only applies to the torch backend"""
+    embedder = create_document_embedder(backend="torch", model_kwargs={"device_map": "cpu"}, torch_dtype="bfloat16")
+    assert embedder.model_kwargs == {"device_map": "cpu", "torch_dtype": "bfloat16"}
+    
+    embedder = create_text_embedder(backend="onnx", torch_dtype="bfloat16")
+    assert embedder.model_kwargs is None
+
+def test_embedders_share_settings():
+    """Test that both embedders are configured with the same model settings"""
+    model_kwargs = {"file_name": "onnx/model_O3.onnx"}
+    document_embedder = create_document_embedder("custom/model", backend="torch", model_kwargs=model_kwargs)
+    text_embedder = create_text_embedder("custom/model", backend="torch", model_kwargs=model_kwargs)
+    
+    for attribute in ("model", "backend", "model_kwargs", "normalize_embeddings"):
+        assert getattr(document_embedder, attribute) == getattr(text_embedder, attribute)
+
+def test_query_embedder_without_progress_bar():
+    """Test that embedding a query does not create a progress bar"""
+    assert create_text_embedder().progress_bar is False
+
+def test_embedders_share_loaded_model():
+    """Test that the model is loaded once for every embedder created with the same settings"""
+    backend_module = "haystack.components.embedders.backends.sentence_transformers_backend"
+    with patch(f"{backend_module}._SentenceTransformersEmbeddingBackend") as mock_backend, \
+         patch.dict(f"{backend_module}._SentenceTransformersEmbeddingBackendFactory._instances", clear=True):
+        embedders = [create_text_embedder(), create_text_embedder(), create_document_embedder()]
+        for embedder in embedders:
+            embedder.warm_up()
+        
+        mock_backend.assert_called_once()
+        assert len({id(embedder.embedding_backend) for embedder in embedders}) == 1
+
+def test_embed_texts_single_call():
+    """Test that all texts are embedded in one backend call with the embedder settings"""
+    embedder = create_text_embedder()
+    embedder.prefix = "query: "
+    embedder.embedding_backend = Mock()
+    embedder.embedding_backend.embed.return_value = [[1.0], [2.0]]
+    
+    assert embed_texts(embedder, ["first", "second"]) == [[1.0], [2.0]]
+    embedder.embedding_backend.embed.assert_called_once()
+    args, kwargs = embedder.embedding_backend.embed.call_args
+    assert args[0] == ["query: first", "query: second"]
+    assert kwargs["normalize_embeddings"] is True
+
+def test_compile_embedder():
+    """Test that the transformer is compiled only once"""
+    embedder = create_text_embedder(backend="torch")
+    transformer = torch.nn.Module()
+    transformer.auto_model = torch.nn.Linear(2, 2)
+    compiled_model = torch.nn.Module()
+    compiled_model._orig_mod = transformer.auto_model
+    
+    with patch.object(embedder, "warm_up"), \
+         patch.object(embedder, "embedding_backend", create=True) as mock_backend, \
+         patch("torch.compile") as mock_compile:
+        mock_backend.model = [transformer]
+        mock_compile.return_value = compiled_model
+        compile_embedder(embedder)
+        compile_embedder(embedder)
+    
+    mock_compile.assert_called_once()
+    assert mock_compile.call_args.kwargs["backend"] == "inductor"
+    assert transformer.auto_model is compiled_model
+
+def test_compile_enabled_by_environment():
+    """Test that embedders are only compiled when TORCH_COMPILE is set"""
+    with patch("F1_RAG.RAG.embedders.compile_embedder") as mock_compile:
+        create_text_embedder()
+        mock_compile.assert_not_called()
+        with patch.dict("os.environ", {"TORCH_COMPILE": "1"}):
+            create_text_embedder()
+        mock_compile.assert_called_once()
+
+def test_compile_skipped_for_onnx():
+    """Test that compiling an ONNX embedder does not load the model"""
+    embedder = create_document_embedder(backend="onnx")
+    with patch.object(embedder, "warm_up") as mock_warm_up:
+        compile_embedder(embedder)
+    mock_warm_up.assert_not_called()
@@ -0,0 +1,46 @@
+"""
+Tests for embedding_cache.py focusing on cache keys and document routing
+"""
+
+import pytest
+from haystack import Document
+from F1_RAG.RAG.embedding_cache import EmbeddingCache, EmbeddingCacheLookup, EmbeddingCacheWriter
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(tmp_path / "cache" / "embeddings.db", namespace="model|onnx")
+
+def test_put_and_get(cache):
+    """Test that a cached embedding is returned for the same content only"""
+    assert cache.get("Monaco") is None
+    cache.put("Monaco", [0.5, 0.25])
+    
+    assert cache.get("Monaco") == [0.5, 0.25]
+    assert cache.get("Monza") is None
+
+def test_namespace_separates_settings(cache, tmp_path):
+    """Test that embeddings cached for other embedder settings are not returned"""
+    cache.put("Monaco", [0.5, 0.25])
+    other_cache = EmbeddingCache(tmp_path / "cache" / "embeddings.db", namespace="model|torch")
+    assert other_cache.get("Monaco") is None
+
+def test_get_many_and_persistence(cache):
+    """Test batch lookups, and that embeddings survive closing the database"""
+    cache.put_many([("Monaco", [0.5, 0.25]), ("Spa", [0.0, 1.0])])
+    cache.close()
+    
+    assert cache.get_many(["Spa", "Monza", "Monaco"]) == [[0.0, 1.0], None, [0.5, 0.25]]
+
+def test_lookup_and_writer(cache):
+    """Test that only missing documents are routed to the embedder, and all are returned"""
+    cache.put("cached", [1.0, 0.0])
+    documents = [Document(content="cached"), Document(content="new")]
+    
+    routed = EmbeddingCacheLookup(cache).run(documents=documents)
+    assert [doc.content for doc in routed["missing"]] == ["new"]
+    assert routed["cached"][0].embedding == [1.0, 0.0]
+    
+    embedded = [Document(content="new", embedding=[0.0, 1.0])]
+    merged = EmbeddingCacheWriter(cache).run(embedded=embedded, cached=routed["cached"])
+    assert sorted(doc.content for doc in merged["documents"]) == ["cached", "new"]
+    assert cache.get("new") == [0.0, 1.0]
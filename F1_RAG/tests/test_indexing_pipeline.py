@@ -3,9 +3,25 @@ Tests for indexing_pipeline.py focusing on configuration and integration points
 """
 
 import pytest
+from typing import List
+from unittest.mock import patch
+from haystack import Document, component
 from haystack.document_stores.in_memory import InMemoryDocumentStore
 from F1_RAG.RAG.indexing_pipeline import create_indexing_pipeline
 
+@component
+class FakeDocumentEmbedder:
+    """Embedder recording the documents it embeds"""
+    
+    def __init__(self):
+        self.model_kwargs = None
+        self.embedded = []
+    
+    @component.output_types(documents=List[Document])
+    def run(self, documents: List[Document]):
+        self.embedded.extend(doc.content for doc in documents)
+        return {"documents": [Document(content=doc.content, meta=doc.meta, embedding=[1.0, 0.0]) for doc in documents]}
+
 @pytest.fixture
 def document_store():
     return InMemoryDocumentStore()
@@ -26,3 +42,29 @@ def test_custom_model_configuration(document_store):
     
     embedder = pipeline.get_component("embedder")
     assert embedder.model == custom_model
+
+def test_embedder_batch_size(document_store):
+    """Test that the embedder forward pass batch size is configurable"""
+    pipeline = create_indexing_pipeline(document_store, embedder_batch_size=128)
+    assert pipeline.get_component("embedder").batch_size == 128
+
+def test_embedding_cache_skips_indexed_documents(tmp_path):
+    """Test that documents indexed by a previous run are not embedded again"""
+    (tmp_path / "monaco.txt").write_text("Monaco")
+    (tmp_path / "monza.txt").write_text("Monza")
+    sources = [str(tmp_path / "monaco.txt"), str(tmp_path / "monza.txt")]
+    cache_path = str(tmp_path / "embeddings.db")
+    
+    first_embedder, second_embedder = FakeDocumentEmbedder(), FakeDocumentEmbedder()
+    with patch('F1_RAG.RAG.indexing_pipeline.create_document_embedder', side_effect=[first_embedder, second_embedder]):
+        first_pipeline = create_indexing_pipeline(InMemoryDocumentStore(), embedding_cache_path=cache_path)
+        second_pipeline = create_indexing_pipeline(InMemoryDocumentStore(), embedding_cache_path=cache_path)
+    
+    first_pipeline.run({"sources": sources[:1]})
+    second_store = second_pipeline.get_component("writer").document_store
+    second_pipeline.run({"sources": sources})
+    
+    assert first_embedder.embedded == ["Monaco"]
+    assert second_embedder.embedded == ["Monza"]
+    assert second_store.count_documents() == 2
+    assert all(doc.embedding == [1.0, 0.0] for doc in second_store.filter_documents())
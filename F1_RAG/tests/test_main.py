@@ -2,10 +2,29 @@
 Tests for main.py focusing on RAGSystem initialization and error handling
 """
 
+import asyncio
+import threading
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
+from F1_RAG.RAG.document_store import MatrixDocumentStore
 from F1_RAG.RAG.main import RAGSystem
 
+@pytest.fixture(autouse=True)
+def index_in_temp_dir(tmp_path, monkeypatch):
+    # Indexes are saved relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+def mock_rag_pipeline(reply="Test answer"):
+    """Create a mock RAG pipeline whose components embed, retrieve, build a prompt and reply"""
+    components = {name: Mock(spec=["run"]) for name in ("query_embedder", "retriever", "prompt_builder", "generator")}
+    components["query_embedder"].run.return_value = {"embedding": [0.1, 0.2, 0.3]}
+    components["retriever"].run.return_value = {"documents": []}
+    components["prompt_builder"].run.side_effect = lambda query, documents: {"prompt": query}
+    components["generator"].run.return_value = {"replies": [reply]}
+    mock_pipeline = Mock()
+    mock_pipeline.get_component.side_effect = components.get
+    return mock_pipeline, components
+
 @pytest.fixture
 def temp_docs_dir(tmp_path):
     # Create a test document
@@ -42,12 +61,7 @@ def test_successful_query(temp_docs_dir):
         mock_get_docs.return_value = [test_doc]
         
         # Create a mock pipeline that returns a specific response
-        mock_pipeline = Mock()
-        mock_pipeline.run.return_value = {
-            "generator": {
-                "replies": ["Test answer"]
-            }
-        }
+        mock_pipeline, components = mock_rag_pipeline("Test answer")
         mock_create_pipeline.return_value = mock_pipeline
         
         # Create and initialize RAG system
@@ -58,8 +72,10 @@ def test_successful_query(temp_docs_dir):
         result = rag_system.query("test question")
         assert result == "Test answer"
         
-        # Verify the pipeline was called correctly
-        mock_pipeline.run.assert_called_once()
+        # The question is embedded once and its embedding is passed on to the retriever
+        components["query_embedder"].run.assert_called_once_with(text="test question")
+        components["retriever"].run.assert_called_once_with(query_embedding=[0.1, 0.2, 0.3])
+        components["generator"].run.assert_called_once_with(prompt="test question")
 
 def test_query_error_handling(temp_docs_dir):
     """Test error handling during query processing"""
@@ -70,8 +86,8 @@ def test_query_error_handling(temp_docs_dir):
          patch('F1_RAG.RAG.main.index_documents') as mock_index:
         
         # Configure mock pipeline to raise an exception
-        mock_pipeline = Mock()
-        mock_pipeline.run.side_effect = Exception("Pipeline error")
+        mock_pipeline, components = mock_rag_pipeline()
+        components["generator"].run.side_effect = Exception("Pipeline error")
         mock_create_pipeline.return_value = mock_pipeline
         
         # Initialize and query
@@ -83,6 +99,189 @@ def test_query_error_handling(temp_docs_dir):
         # Verify index_documents was called
         mock_index.assert_called_once()
 
+def test_unchanged_corpus_not_reindexed(temp_docs_dir):
+    """Test that the saved index is reused while the documents are unchanged"""
+    with patch('F1_RAG.RAG.main.create_rag_pipeline'), \
+         patch('F1_RAG.RAG.main.create_indexing_pipeline'), \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[temp_docs_dir / "test.txt"]), \
+         patch('F1_RAG.RAG.main.index_documents') as mock_index:
+        
+        RAGSystem(docs_dir=str(temp_docs_dir)).initialize()
+        RAGSystem(docs_dir=str(temp_docs_dir)).initialize()
+        assert mock_index.call_count == 1
+        
+        (temp_docs_dir / "test.txt").write_text("Modified content")
+        RAGSystem(docs_dir=str(temp_docs_dir)).initialize()
+        assert mock_index.call_count == 2
+
+def test_repeated_query_served_from_cache(temp_docs_dir):
+    """Test that a repeated question is answered from the query cache"""
+    with patch('F1_RAG.RAG.main.create_rag_pipeline') as mock_create_pipeline, \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[str(temp_docs_dir / "test.txt")]), \
+         patch('F1_RAG.RAG.main.index_documents'):
+        
+        mock_pipeline, components = mock_rag_pipeline("Test answer")
+        mock_create_pipeline.return_value = mock_pipeline
+        
+        rag_system = RAGSystem(docs_dir=str(temp_docs_dir))
+        rag_system.initialize()
+        
+        assert rag_system.query("test question") == "Test answer"
+        assert rag_system.query("test question") == "Test answer"
+        
+        # The second answer must come from the cache, not the LLM
+        assert components["generator"].run.call_count == 1
+        # The repeated question is found by its text, without embedding it again
+        assert components["query_embedder"].run.call_count == 1
+
+def test_aquery_batch(temp_docs_dir):
+    """Test that several questions are answered concurrently in order"""
+    with patch('F1_RAG.RAG.main.create_rag_pipeline') as mock_create_pipeline, \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[str(temp_docs_dir / "test.txt")]), \
+         patch('F1_RAG.RAG.main.index_documents'):
+        
+        questions = ["first question", "second question"]
+        embeddings = {"first question": [1.0, 0.0], "second question": [0.0, 1.0]}
+        
+        async def retrieve(query_embedding):
+            await asyncio.sleep(0)
+            return {"documents": []}
+        
+        embedding_threads = []
+        generation_threads = []
+        
+        def embed(text):
+            embedding_threads.append(threading.get_ident())
+            return {"embedding": embeddings[text]}
+        
+        def generate(prompt):
+            generation_threads.append(threading.get_ident())
+            return {"replies": [f"answer to {prompt}"]}
+        
+        mock_pipeline, components = mock_rag_pipeline()
+        components["query_embedder"].run.side_effect = embed
+        components["retriever"] = Mock(spec=["run", "run_async"])
+        components["retriever"].run_async = AsyncMock(side_effect=retrieve)
+        components["generator"].run.side_effect = generate
+        mock_create_pipeline.return_value = mock_pipeline
+        
+        rag_system = RAGSystem(docs_dir=str(temp_docs_dir))
+        rag_system.initialize()
+        
+        answers = asyncio.run(rag_system.aquery_batch(questions))
+        assert answers == ["answer to first question", "answer to second question"]
+        # Each question is embedded once and its embedding is passed on to the retriever
+        assert components["query_embedder"].run.call_count == 2
+        retrieved = [call.kwargs["query_embedding"] for call in components["retriever"].run_async.await_args_list]
+        assert sorted(retrieved) == sorted(embeddings.values())
+        components["retriever"].run.assert_not_called()
+        mock_pipeline.run.assert_not_called()
+        # The questions are embedded and answered outside of the event loop thread
+        assert len(embedding_threads) == len(generation_threads) == 2
+        assert threading.get_ident() not in embedding_threads + generation_threads
+
+def test_query_batch(temp_docs_dir):
+    """Test that the questions are embedded together and answered in order"""
+    with patch('F1_RAG.RAG.main.create_rag_pipeline') as mock_create_pipeline, \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[str(temp_docs_dir / "test.txt")]), \
+         patch('F1_RAG.RAG.main.index_documents'), \
+         patch('F1_RAG.RAG.main.embed_texts') as mock_embed:
+        
+        mock_embed.side_effect = [[[1.0, 0.0], [0.0, 1.0], [1.0, 0.0]], [[0.5, 0.5]]]
+        components = {name: Mock() for name in ("query_embedder", "retriever", "prompt_builder", "generator")}
+        components["retriever"].run.return_value = {"documents": []}
+        components["prompt_builder"].run.side_effect = lambda query, documents: {"prompt": query}
+        components["generator"].run.side_effect = lambda prompt: {"replies": [f"answer to {prompt}"]}
+        mock_pipeline = Mock()
+        mock_pipeline.get_component.side_effect = components.get
+        mock_create_pipeline.return_value = mock_pipeline
+        
+        rag_system = RAGSystem(docs_dir=str(temp_docs_dir))
+        rag_system.initialize()
+        
+        answers = rag_system.query_batch(["first", "second", "first again"])
+        assert answers == ["answer to first", "answer to second", "answer to first"]
+        mock_embed.assert_called_once_with(components["query_embedder"], ["first", "second", "first again"])
+        # The repeated question is served from the cache
+        assert components["generator"].run.call_count == 2
+        
+        # Questions answered before are not embedded again
+        assert rag_system.query_batch(["second", "third"]) == ["answer to second", "answer to third"]
+        mock_embed.assert_called_with(components["query_embedder"], ["third"])
+
+def test_query_batch_without_initialization(temp_docs_dir):
+    rag_system = RAGSystem(docs_dir=str(temp_docs_dir))
+    
+    with pytest.raises(RuntimeError, match="RAG pipeline not initialized"):
+        rag_system.query_batch(["test question"])
+
+def test_aquery_without_initialization(temp_docs_dir):
+    """Test async querying before initialization"""
+    rag_system = RAGSystem(docs_dir=str(temp_docs_dir))
+    
+    with pytest.raises(RuntimeError, match="RAG pipeline not initialized"):
+        asyncio.run(rag_system.aquery("test question"))
+
+def test_pipelines_share_embedder_settings(temp_docs_dir):
+    """Test that both pipelines create their embedder with the same settings, sharing the model"""
+    with patch('F1_RAG.RAG.main.create_rag_pipeline') as mock_create_rag, \
+         patch('F1_RAG.RAG.main.create_indexing_pipeline') as mock_create_indexing, \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[str(temp_docs_dir / "test.txt")]), \
+         patch('F1_RAG.RAG.main.index_documents'):
+        
+        rag_system = RAGSystem(docs_dir=str(temp_docs_dir), embedder_model="custom/embedder", index_path=None)
+        rag_system.initialize()
+        
+        indexing_kwargs = mock_create_indexing.call_args.kwargs
+        rag_kwargs = mock_create_rag.call_args.kwargs
+        assert indexing_kwargs["model_name"] == rag_kwargs["embedder_model"] == "custom/embedder"
+        for setting, value in rag_system.embedder_settings.items():
+            assert indexing_kwargs[setting] == rag_kwargs[setting] == value
+
+def test_rag_pipeline_created_before_indexing(temp_docs_dir):
+    """Test that the model is loaded by the RAG pipeline before the indexing pipeline uses it"""
+    calls = []
+    with patch('F1_RAG.RAG.main.create_rag_pipeline', side_effect=lambda **kwargs: calls.append("rag") or Mock()), \
+         patch('F1_RAG.RAG.main.create_indexing_pipeline', side_effect=lambda **kwargs: calls.append("indexing")), \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[str(temp_docs_dir / "test.txt")]), \
+         patch('F1_RAG.RAG.main.index_documents'):
+        
+        rag_system = RAGSystem(docs_dir=str(temp_docs_dir), index_path=None)
+        rag_system.initialize()
+        
+        assert calls == ["rag", "indexing"]
+        assert rag_system.rag_pipeline is not None
+
+def test_small_corpus_searched_exactly(temp_docs_dir):
+    """Test that a small corpus is indexed in an exact flat index"""
+    with patch('F1_RAG.RAG.main.create_rag_pipeline'), \
+         patch('F1_RAG.RAG.main.create_indexing_pipeline'), \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[str(temp_docs_dir / "test.txt")]), \
+         patch('F1_RAG.RAG.main.index_documents'):
+        
+        rag_system = RAGSystem(docs_dir=str(temp_docs_dir), index_path=None)
+        assert rag_system.document_store is None
+        rag_system.initialize()
+        
+        assert rag_system.document_store.index_string == "Flat"
+
+def test_matrix_document_store_from_config(temp_docs_dir):
+    """Test that the matrix document store is used when configured, and reloaded on the next run"""
+    with patch('F1_RAG.RAG.main.DEFAULT_DOCUMENT_STORE', "matrix"), \
+         patch('F1_RAG.RAG.main.DEFAULT_MATRIX_EMBEDDINGS_PATH', None), \
+         patch('F1_RAG.RAG.main.create_rag_pipeline') as mock_create_rag, \
+         patch('F1_RAG.RAG.main.create_indexing_pipeline'), \
+         patch('F1_RAG.RAG.main.get_documents_from_directory', return_value=[str(temp_docs_dir / "test.txt")]), \
+         patch('F1_RAG.RAG.main.index_documents') as mock_index:
+        
+        rag_system = RAGSystem(docs_dir=str(temp_docs_dir))
+        rag_system.initialize()
+        assert isinstance(rag_system.document_store, MatrixDocumentStore)
+        assert mock_create_rag.call_args.kwargs["document_store"] is rag_system.document_store
+        
+        RAGSystem(docs_dir=str(temp_docs_dir)).initialize()
+        mock_index.assert_called_once()
+
 def test_custom_configuration(temp_docs_dir):
     """Test RAGSystem initialization with custom configuration"""
     custom_embedder = "custom/embedder"
@@ -0,0 +1,94 @@
+"""
+Tests for query_cache.py
+
+This module contains tests for the semantic query cache, including:
+- Cache hits and misses based on similarity
+- Exact matches on the question text
+- LRU eviction
+- Reply expiration, skipping expired replies of the most similar queries
+"""
+
+import pytest
+from unittest.mock import patch
+from F1_RAG.RAG.query_cache import SemanticQueryCache
+
+@pytest.fixture
+def cache():
+    return SemanticQueryCache(threshold=0.9, max_size=2)
+
+def test_lookup_empty_cache(cache):
+    assert cache.lookup([1.0, 0.0, 0.0]) is None
+
+def test_lookup_similar_query(cache):
+    cache.add([1.0, 0.0, 0.0], "answer")
+    # Scaled and slightly rotated embeddings are still above the similarity threshold
+    assert cache.lookup([2.0, 0.1, 0.0]) == "answer"
+
+def test_lookup_dissimilar_query(cache):
+    cache.add([1.0, 0.0, 0.0], "answer")
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+
+def test_lookup_text(cache):
+    cache.add([1.0, 0.0, 0.0], "answer", text="Who won the 2021 title?")
+    # Case and whitespace are ignored
+    assert cache.lookup_text("  who won the 2021   TITLE? ") == "answer"
+    assert cache.lookup_text("Who won the 2020 title?") is None
+
+def test_lookup_text_evicted_with_entry(cache):
+    cache.add([1.0, 0.0, 0.0], "first", text="first question")
+    cache.add([0.0, 1.0, 0.0], "second", text="second question")
+    cache.add([0.0, 0.0, 1.0], "third", text="third question")
+    
+    assert cache.lookup_text("first question") is None
+    assert cache.lookup_text("third question") == "third"
+
+def test_lru_eviction(cache):
+    cache.add([1.0, 0.0, 0.0], "first")
+    cache.add([0.0, 1.0, 0.0], "second")
+    cache.lookup([1.0, 0.0, 0.0])  # Mark "first" as recently used
+    cache.add([0.0, 0.0, 1.0], "third")
+    
+    assert len(cache) == 2
+    assert cache.lookup([1.0, 0.0, 0.0]) == "first"
+    assert cache.lookup([0.0, 1.0, 0.0]) is None
+    assert cache.lookup([0.0, 0.0, 1.0]) == "third"
+
+def test_ttl_expiration():
+    cache = SemanticQueryCache(ttl=10)
+    with patch('F1_RAG.RAG.query_cache.time.monotonic', return_value=100.0):
+        cache.add([1.0, 0.0], "answer")
+    with patch('F1_RAG.RAG.query_cache.time.monotonic', return_value=105.0):
+        assert cache.lookup([1.0, 0.0]) == "answer"
+    with patch('F1_RAG.RAG.query_cache.time.monotonic', return_value=111.0):
+        assert cache.lookup([1.0, 0.0]) is None
+    assert len(cache) == 0
+
+def test_expired_closest_entry_skipped():
+    cache = SemanticQueryCache(threshold=0.9, ttl=10)
+    with patch('F1_RAG.RAG.query_cache.time.monotonic', return_value=100.0):
+        cache.add([1.0, 0.0], "expired answer")
+    with patch('F1_RAG.RAG.query_cache.time.monotonic', return_value=105.0):
+        cache.add([1.0, 0.2], "valid answer")
+        cache.add([0.0, 1.0], "other answer")
+    with patch('F1_RAG.RAG.query_cache.time.monotonic', return_value=111.0):
+        # The most similar entry expired, the next one above the threshold is returned
+        assert cache.lookup([1.0, 0.0]) == "valid answer"
+    assert len(cache) == 2
+
+def test_most_similar_entry_returned(cache):
+    cache.add([1.0, 0.2, 0.0], "close")
+    cache.add([1.0, 0.0, 0.0], "closest")
+    assert cache.lookup([1.0, 0.01, 0.0]) == "closest"
+
+def test_dimension_mismatch(cache):
+    cache.add([1.0, 0.0, 0.0], "answer")
+    with pytest.raises(ValueError):
+        cache.add([1.0, 0.0], "answer")
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        SemanticQueryCache(threshold=0)
+    with pytest.raises(ValueError):
+        SemanticQueryCache(max_size=0)
+    with pytest.raises(ValueError):
+        SemanticQueryCache(ttl=0)
@@ -1,11 +1,17 @@
 """
-Minimal tests for RAG pipeline configuration validation
+Minimal tests for RAG pipeline configuration validation and component creation
 """
 
 import pytest
 from unittest.mock import patch
+from haystack import Document
+from haystack.components.retrievers.in_memory import InMemoryEmbeddingRetriever
 from haystack.document_stores.in_memory import InMemoryDocumentStore
-from F1_RAG.RAG.RAG_pipeline import create_rag_pipeline
+from F1_RAG.RAG.retrievers import NumbaEmbeddingRetriever
+from haystack_integrations.components.retrievers.faiss import FAISSEmbeddingRetriever
+from F1_RAG.RAG.RAG_pipeline import create_prompt_builder, create_rag_pipeline, create_retriever
+from F1_RAG.RAG.config.config import prompt
+from F1_RAG.RAG.document_store import MatrixDocumentStore, create_document_store
 
 @pytest.fixture
 def document_store():
@@ -23,4 +29,25 @@ def test_missing_required_params():
         create_rag_pipeline(prompt_template="test")
 
     with pytest.raises(ValueError, match="prompt_template is required"):
-        create_rag_pipeline(document_store=InMemoryDocumentStore())
\ No newline at end of file
+        create_rag_pipeline(document_store=InMemoryDocumentStore())
+
+def test_retriever_matches_document_store():
+    """Test that the retriever type follows the document store type"""
+    faiss_store = create_document_store(embedding_dim=3)
+    assert isinstance(create_retriever(faiss_store, top_k=2), FAISSEmbeddingRetriever)
+    assert isinstance(create_retriever(MatrixDocumentStore(), top_k=2), NumbaEmbeddingRetriever)
+    assert type(create_retriever(InMemoryDocumentStore(), top_k=2)) is InMemoryEmbeddingRetriever
+
+def test_prompt_template_compiled_once():
+    """Test that running the prompt builder renders the template without compiling it again"""
+    prompt_builder = create_prompt_builder(prompt)
+    with patch.object(prompt_builder._env, 'from_string') as mock_from_string:
+        result = prompt_builder.run(query="Who won?", documents=[Document(content="Monaco GP")])
+    
+    mock_from_string.assert_not_called()
+    assert "Monaco GP" in result["prompt"]
+    assert "Question: Who won?" in result["prompt"]
+
+def test_prompt_builder_requires_query():
+    with pytest.raises(ValueError):
+        create_prompt_builder(prompt).run(documents=[])
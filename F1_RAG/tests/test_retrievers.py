@@ -0,0 +1,105 @@
+"""
+Tests for retrievers.py checking results against InMemoryEmbeddingRetriever
+"""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+from haystack import Document
+from haystack.components.retrievers.in_memory import InMemoryEmbeddingRetriever
+from haystack.document_stores.in_memory import InMemoryDocumentStore
+from haystack.document_stores.types import DuplicatePolicy
+from F1_RAG.RAG.document_store import MatrixDocumentStore
+from F1_RAG.RAG.retrievers import NumbaEmbeddingRetriever, _top_k_numpy
+
+def random_documents(count):
+    rng = np.random.default_rng(0)
+    return [Document(content=f"doc {i}", embedding=rng.normal(size=8).tolist()) for i in range(count)]
+
+def create_document_store(similarity="dot_product", count=50, store_class=MatrixDocumentStore):
+    document_store = store_class(embedding_similarity_function=similarity)
+    document_store.write_documents(random_documents(count))
+    return document_store
+
+@pytest.mark.parametrize("similarity", ["dot_product", "cosine"])
+@pytest.mark.parametrize("scale_score", [False, True])
+def test_matches_in_memory_retriever(similarity, scale_score):
+    """Test that the same documents and scores are returned as the in-memory retriever"""
+    document_store = create_document_store(similarity)
+    in_memory_store = create_document_store(similarity, store_class=InMemoryDocumentStore)
+    query = np.random.default_rng(1).normal(size=8).tolist()
+    
+    expected = InMemoryEmbeddingRetriever(in_memory_store, top_k=5, scale_score=scale_score).run(query)["documents"]
+    results = NumbaEmbeddingRetriever(document_store, top_k=5, scale_score=scale_score).run(query)["documents"]
+    
+    assert [doc.id for doc in results] == [doc.id for doc in expected]
+    assert [doc.score for doc in results] == pytest.approx([doc.score for doc in expected], rel=1e-4)
+    assert all(doc.embedding is None for doc in results)
+
+def test_numpy_fallback_matches_kernel():
+    """Test that the NumPy fallback selects the same top-k as the compiled kernel"""
+    rng = np.random.default_rng(2)
+    matrix = rng.normal(size=(100, 8)).astype(np.float32)
+    query = rng.normal(size=8).astype(np.float32)
+    
+    document_store = create_document_store()
+    retriever = NumbaEmbeddingRetriever(document_store, top_k=3)
+    with patch('F1_RAG.RAG.retrievers._top_k_inner_product', wraps=_top_k_numpy) as mock_kernel:
+        retriever.run(query.tolist())
+        mock_kernel.assert_called_once()
+    
+    from F1_RAG.RAG.retrievers import _top_k_inner_product
+    indices, _ = _top_k_inner_product(matrix, query, 3)
+    expected, _ = _top_k_numpy(matrix, query, 3)
+    assert list(indices) == list(expected)
+
+def test_matrix_updated_after_write():
+    """Test that documents written after the first query are retrievable"""
+    document_store = create_document_store(count=5)
+    retriever = NumbaEmbeddingRetriever(document_store, top_k=1)
+    retriever.run([0.0] * 8)
+    
+    document_store.write_documents([Document(content="new", embedding=[10.0] * 8)])
+    assert retriever.run([1.0] * 8)["documents"][0].content == "new"
+
+def test_matrix_updated_after_overwrite():
+    """Test that documents overwritten at the same count are not served with their old embedding"""
+    document_store = create_document_store(count=5)
+    retriever = NumbaEmbeddingRetriever(document_store, top_k=1)
+    target = document_store.filter_documents()[0]
+    retriever.run([0.0] * 8)
+    
+    document_store.write_documents(
+        [Document(id=target.id, content="overwritten", embedding=[10.0] * 8)],
+        policy=DuplicatePolicy.OVERWRITE
+    )
+    assert document_store.count_documents() == 5
+    result = retriever.run([1.0] * 8)["documents"][0]
+    assert (result.id, result.content) == (target.id, "overwritten")
+
+def test_filters_delegated_to_document_store():
+    """Test that filtered queries only return matching documents"""
+    document_store = create_document_store(count=10)
+    document_store.write_documents([Document(content="monaco", meta={"race": "monaco"}, embedding=[0.0] * 8)])
+    retriever = NumbaEmbeddingRetriever(document_store, top_k=3)
+    
+    filters = {"field": "meta.race", "operator": "==", "value": "monaco"}
+    documents = retriever.run([1.0] * 8, filters=filters)["documents"]
+    assert [doc.content for doc in documents] == ["monaco"]
+
+def test_scores_matrix_document_store():
+    """Test that the matrix of a MatrixDocumentStore is scored without being rebuilt"""
+    document_store = MatrixDocumentStore(embedding_similarity_function="dot_product")
+    document_store.write_documents([Document(content=str(i), embedding=[float(i), 1.0]) for i in range(5)])
+    retriever = NumbaEmbeddingRetriever(document_store, top_k=2)
+    
+    assert [doc.content for doc in retriever.run([1.0, 0.0])["documents"]] == ["4", "3"]
+
+def test_empty_document_store():
+    retriever = NumbaEmbeddingRetriever(MatrixDocumentStore(), top_k=3)
+    assert retriever.run([1.0, 0.0])["documents"] == []
+
+def test_requires_matrix_document_store():
+    """Test that stores without an embedding matrix are rejected"""
+    with pytest.raises(ValueError):
+        NumbaEmbeddingRetriever(InMemoryDocumentStore())
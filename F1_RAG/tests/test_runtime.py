@@ -0,0 +1,54 @@
+"""
+Tests for runtime.py focusing on thread and HTTP client configuration
+"""
+
+import os
+from unittest.mock import patch
+from F1_RAG.config.runtime import configure_http_client, configure_runtime
+
+def test_thread_count_from_environment():
+    """Test that the thread count can be overridden through TORCH_NUM_THREADS"""
+    with patch.dict('os.environ', {"TORCH_NUM_THREADS": "3"}), \
+         patch('torch.set_num_threads') as mock_set_threads, \
+         patch('torch.set_num_interop_threads'), \
+         patch('faiss.omp_set_num_threads'), \
+         patch('threadpoolctl.threadpool_limits'):
+        assert configure_runtime() == 3
+        mock_set_threads.assert_called_once_with(3)
+
+def test_library_thread_pools_resized():
+    """Test that the FAISS and BLAS thread pools are resized, not configured through the environment"""
+    with patch.dict('os.environ', {"TORCH_NUM_THREADS": "3"}), \
+         patch('torch.set_num_threads'), \
+         patch('torch.set_num_interop_threads', side_effect=RuntimeError), \
+         patch('faiss.omp_set_num_threads') as mock_faiss_threads, \
+         patch('threadpoolctl.threadpool_limits') as mock_limits:
+        os.environ.pop("OMP_NUM_THREADS", None)
+        configure_runtime()
+        mock_faiss_threads.assert_called_once_with(3)
+        mock_limits.assert_called_once_with(limits=3, user_api="blas")
+        assert "OMP_NUM_THREADS" not in os.environ
+
+def test_http_clients_keep_connections():
+    """Test that the huggingface_hub clients keep idle connections and retry failed connections"""
+    with patch('huggingface_hub.set_client_factory') as mock_set_factory, \
+         patch('huggingface_hub.set_async_client_factory') as mock_set_async_factory:
+        assert configure_http_client(max_connections=8, keepalive_expiry=30.0, retries=2)
+    
+    client = mock_set_factory.call_args.args[0]()
+    pool = client._transport._pool
+    assert pool._max_connections == 8
+    assert pool._keepalive_expiry == 30.0
+    assert pool._retries == 2
+    assert client.follow_redirects
+    client.close()
+    assert mock_set_async_factory.call_args.args[0]().follow_redirects
+
+def test_http_clients_kept_without_hub_hooks():
+    """Test that the default clients are kept when the huggingface_hub request hooks cannot be imported"""
+    with patch('huggingface_hub.set_client_factory') as mock_set_factory, \
+         patch('huggingface_hub.set_async_client_factory') as mock_set_async_factory, \
+         patch.dict('sys.modules', {'huggingface_hub.utils._http': None}):
+        assert not configure_http_client()
+    mock_set_factory.assert_not_called()
+    mock_set_async_factory.assert_not_called()
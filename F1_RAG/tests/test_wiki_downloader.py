@@ -5,10 +5,13 @@ This module contains unit tests for the WikiCategoryDownloader class functionali
 including category traversal, article saving, and filename sanitization.
 """
 
+import asyncio
+import httpx
+import json
 import pytest
 from pathlib import Path
-from unittest.mock import Mock, patch, mock_open
-from F1_RAG.wiki_downloader.wiki_downloader import WikiCategoryDownloader
+from unittest.mock import AsyncMock, Mock, patch, mock_open
+from F1_RAG.wiki_downloader.wiki_downloader import ArticleShardWriter, TitleHashSet, WikiCategoryDownloader
 
 # Test configuration
 TEST_CATEGORY = "TEST_CATEGORY"
@@ -37,7 +40,7 @@ def create_mock_article(title=TEST_ARTICLE_TITLE):
     """Helper function to create a mock Wikipedia article."""
     mock_article = Mock()
     mock_article.title = title
-    mock_article.fullurl = TEST_ARTICLE_URL
+    mock_article.language = "en"
     mock_article.summary = TEST_ARTICLE_SUMMARY
     mock_article.text = TEST_ARTICLE_TEXT
     mock_article.ns = 0  # Regular article namespace
@@ -62,6 +65,30 @@ def test_create_safe_filename():
         result = WikiCategoryDownloader._create_safe_filename(input_title)
         assert result == expected
 
+def test_article_url():
+    """Test that article URLs are built like the Wikipedia ones."""
+    assert WikiCategoryDownloader._article_url(create_mock_article()) == TEST_ARTICLE_URL
+    
+    article = create_mock_article("1950 British Grand Prix (Silverstone)")
+    assert WikiCategoryDownloader._article_url(article) == \
+        "https://en.wikipedia.org/wiki/1950_British_Grand_Prix_(Silverstone)"
+    
+    article = create_mock_article("Circuit de Nevers Magny-Cours & Spa?")
+    assert WikiCategoryDownloader._article_url(article) == \
+        "https://en.wikipedia.org/wiki/Circuit_de_Nevers_Magny-Cours_%26_Spa%3F"
+
+def test_create_safe_filename_unicode():
+    """Test filename sanitization of non-ASCII titles."""
+    test_cases = [
+        ("Grand Prix de Monaco – 1955", "Grand_Prix_de_Monaco_1955"),
+        ("Circuit Gilles-Villeneuve (Montréal)", "Circuit_Gilles_Villeneuve_Montréal"),
+        ("日本グランプリ\t2024", "日本グランプリ_2024"),
+        ("Snake_case - title_", "Snake_case_title"),
+    ]
+    
+    for input_title, expected in test_cases:
+        assert WikiCategoryDownloader._create_safe_filename(input_title) == expected
+
 def test_get_categorymembers_nonexistent(downloader):
     """Test handling of non-existent categories."""
     downloader.wiki_api.page.return_value.exists.return_value = False
@@ -83,6 +110,40 @@ def test_get_categorymembers_basic(downloader):
     assert len(articles) == 1
     assert articles[0].title == TEST_ARTICLE_TITLE
 
+def create_mock_category(title, members):
+    """Helper function to create a mock Wikipedia category."""
+    mock_category = Mock()
+    mock_category.title = title
+    mock_category.ns = 14  # Category namespace
+    mock_category.exists.return_value = True
+    mock_category.categorymembers.values.return_value = members
+    return mock_category
+
+def test_get_categorymembers_depth(downloader):
+    """Test traversal of subcategories up to the maximum depth."""
+    deep = create_mock_category("Category:Deep", [create_mock_article("Deep Article")])
+    shared = create_mock_article("Shared Article")
+    sub_a = create_mock_category("Category:A", [shared, create_mock_article("A Article"), deep])
+    sub_b = create_mock_category("Category:B", [shared, sub_a])
+    root = create_mock_category(TEST_CATEGORY, [create_mock_article(), sub_a, sub_b])
+    
+    downloader.wiki_api.page.return_value = root
+    
+    articles = downloader.get_categorymembers(TEST_CATEGORY, max_depth=1, max_workers=4)
+    titles = [article.title for article in articles]
+    assert sorted(titles) == sorted([TEST_ARTICLE_TITLE, "Shared Article", "A Article"])
+    sub_a.categorymembers.values.assert_called_once()
+    deep.categorymembers.values.assert_not_called()
+
+def test_get_categorymembers_seen_category(downloader):
+    """Test that the members of a category requested twice are only fetched once."""
+    category = create_mock_category(TEST_CATEGORY, [create_mock_article()])
+    downloader.wiki_api.page.return_value = category
+    
+    assert len(downloader.get_categorymembers(TEST_CATEGORY)) == 1
+    assert downloader.get_categorymembers(TEST_CATEGORY) == []
+    category.categorymembers.values.assert_called_once()
+
 @patch('pathlib.Path.open', new_callable=mock_open)
 def test_save_article(mock_file, downloader):
     """Test article saving functionality."""
@@ -110,13 +171,110 @@ def test_save_article_io_error(mock_file, downloader):
     # Should not raise exception but log error
     downloader.save_article(mock_article)
 
-def test_save_all_articles(downloader):
+def fake_extract(client, semaphore, title, language):
+    """Fake fetch_extract returning an extract with one section."""
+    return f"Summary of {title}\n\n== Results ==\nResults of {title}"
+
+def test_save_all_articles(downloader, temp_dir):
     """Test saving multiple articles."""
     mock_articles = [create_mock_article(f"Article_{i}") for i in range(3)]
     
-    with patch.object(downloader, 'save_article') as mock_save:
+    with patch('F1_RAG.wiki_downloader.wiki_downloader.fetch_extract', new=AsyncMock(side_effect=fake_extract)) as mock_fetch:
+        downloader.save_all_articles(mock_articles)
+        assert mock_fetch.await_count == 3
+    
+    content = (temp_dir / "Article_0.txt").read_text(encoding='utf-8')
+    assert content == (
+        "Title: Article_0\n"
+        "URL: https://en.wikipedia.org/wiki/Article_0\n\n"
+        "=== Summary ===\n"
+        "Summary of Article_0\n\n"
+        "=== Full Text ===\n"
+        "Summary of Article_0\n\nResults\nResults of Article_0"
+    )
+
+def test_save_all_articles_concurrent(downloader, temp_dir):
+    """Test that concurrently saved articles are all written, skipping failed downloads."""
+    mock_articles = [create_mock_article(f"Article_{i}") for i in range(20)]
+    
+    def flaky_extract(client, semaphore, title, language):
+        if title == "Article_0":
+            raise httpx.ConnectError("Test error")
+        if title == "Article_1":
+            return None
+        return fake_extract(client, semaphore, title, language)
+    
+    with patch('F1_RAG.wiki_downloader.wiki_downloader.fetch_extract', new=AsyncMock(side_effect=flaky_extract)):
+        downloader.save_all_articles(mock_articles, max_workers=4)
+    
+    assert sorted(path.name for path in temp_dir.iterdir()) == sorted(f"Article_{i}.txt" for i in range(2, 20))
+
+def test_save_all_articles_malformed_response(downloader, temp_dir):
+    """Test that a malformed response only fails its own article."""
+    mock_articles = [create_mock_article(f"Article_{i}") for i in range(5)]
+    
+    def malformed_extract(client, semaphore, title, language):
+        if title == "Article_2":
+            raise ValueError("Unexpected response")
+        return fake_extract(client, semaphore, title, language)
+    
+    with patch('F1_RAG.wiki_downloader.wiki_downloader.fetch_extract', new=AsyncMock(side_effect=malformed_extract)):
         downloader.save_all_articles(mock_articles)
-        assert mock_save.call_count == 3
+    
+    assert sorted(path.name for path in temp_dir.iterdir()) == [f"Article_{i}.txt" for i in (0, 1, 3, 4)]
+
+def test_save_all_articles_running_loop(downloader, temp_dir):
+    """Test that articles are saved from a running event loop through asave_all_articles."""
+    async def save():
+        with pytest.raises(RuntimeError):
+            downloader.save_all_articles([create_mock_article()])
+        await downloader.asave_all_articles([create_mock_article()])
+    
+    with patch('F1_RAG.wiki_downloader.wiki_downloader.fetch_extract', new=AsyncMock(side_effect=fake_extract)):
+        asyncio.run(save())
+    
+    assert [path.name for path in temp_dir.iterdir()] == ["Test_Article.txt"]
+
+def test_save_all_articles_invalid_workers(downloader):
+    """Test rejection of an invalid worker count."""
+    with pytest.raises(ValueError):
+        downloader.save_all_articles([create_mock_article()], max_workers=0)
+
+def read_shard(path):
+    """Helper function reading the articles of a shard file."""
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+def test_save_all_articles_sharded(mock_wiki_api, temp_dir):
+    """Test that articles are appended to a single shard file."""
+    downloader = WikiCategoryDownloader(mock_wiki_api, temp_dir, shard_size=1 << 20)
+    mock_articles = [create_mock_article(f"Article_{i}") for i in range(5)]
+    
+    with patch('F1_RAG.wiki_downloader.wiki_downloader.fetch_extract', new=AsyncMock(side_effect=fake_extract)):
+        downloader.save_all_articles(mock_articles)
+    
+    assert [path.name for path in temp_dir.iterdir()] == ["articles_00000.jsonl"]
+    articles = sorted(read_shard(temp_dir / "articles_00000.jsonl"), key=lambda article: article["title"])
+    assert [article["title"] for article in articles] == [f"Article_{i}" for i in range(5)]
+    assert articles[0] == {
+        "title": "Article_0",
+        "url": "https://en.wikipedia.org/wiki/Article_0",
+        "summary": "Summary of Article_0",
+        "text": "Summary of Article_0\n\nResults\nResults of Article_0"
+    }
+
+def test_shard_writer_rollover(temp_dir):
+    """Test that shards are rolled over at their maximum size and numbered after existing ones."""
+    (temp_dir / "articles_00003.jsonl").write_bytes(b"")
+    writer = ArticleShardWriter(temp_dir, max_bytes=160)
+    for i in range(3):
+        writer.write({"title": f"Grand Prix {i}", "text": "x" * 40})
+    writer.close()
+    
+    assert sorted(path.name for path in temp_dir.iterdir()) == \
+        ["articles_00003.jsonl", "articles_00004.jsonl", "articles_00005.jsonl"]
+    assert [article["title"] for article in read_shard(temp_dir / "articles_00004.jsonl")] == \
+        ["Grand Prix 0", "Grand Prix 1"]
+    assert [article["title"] for article in read_shard(temp_dir / "articles_00005.jsonl")] == ["Grand Prix 2"]
 
 def test_duplicate_prevention(downloader):
     """Test prevention of duplicate article processing."""
@@ -132,6 +290,26 @@ def test_duplicate_prevention(downloader):
     
     articles = downloader.get_categorymembers(TEST_CATEGORY)
     assert len(articles) == 1  # Should only include one copy
+    assert downloader.seen_pages == {WikiCategoryDownloader._title_hash(TEST_ARTICLE_TITLE)}
+
+def test_title_hash_set():
+    """Test membership across the buffer and the sorted array of the title hash set."""
+    hashes = [WikiCategoryDownloader._title_hash(f"Article_{i}") for i in range(10)]
+    seen = TitleHashSet(hashes[:7], buffer_size=3)
+    seen.add(hashes[0])
+    
+    assert len(seen) == 7
+    assert seen == set(hashes[:7])
+    assert all(value in seen for value in hashes[:7])
+    assert not any(value in seen for value in hashes[7:])
+    assert -1 not in seen and "Article_0" not in seen
+    
+    seen.discard(hashes[0])
+    seen.discard(hashes[6])
+    assert seen == set(hashes[1:6])
+    
+    with pytest.raises(ValueError):
+        TitleHashSet(buffer_size=0)
 
 if __name__ == '__main__':
     pytest.main(['-v'])
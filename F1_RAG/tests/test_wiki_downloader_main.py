@@ -0,0 +1,27 @@
+"""
+Tests for the wiki downloader entry point, focusing on how the configuration is applied
+"""
+
+from unittest.mock import patch
+from F1_RAG.wiki_downloader import main as downloader_main
+
+def test_main_uses_config(tmp_path):
+    """Test that main creates the articles directory and passes the configuration on"""
+    articles_dir = tmp_path / "data" / "articles"
+
+    with patch.dict(downloader_main.CONFIG, {'ARTICLES_DIR': articles_dir, 'SHARD_SIZE': None}), \
+         patch('F1_RAG.wiki_downloader.main.wikipediaapi.Wikipedia') as mock_wikipedia, \
+         patch('F1_RAG.wiki_downloader.main.WikiCategoryDownloader') as mock_downloader:
+        mock_downloader.return_value.get_categorymembers.return_value = []
+        downloader_main.main()
+
+    assert articles_dir.is_dir()
+    mock_downloader.assert_called_once_with(
+        mock_wikipedia.return_value,
+        articles_dir,
+        user_agent=downloader_main.CONFIG['USER_AGENT'],
+        shard_size=None
+    )
+    mock_downloader.return_value.save_all_articles.assert_called_once_with(
+        [], max_workers=downloader_main.CONFIG['DOWNLOAD_WORKERS']
+    )
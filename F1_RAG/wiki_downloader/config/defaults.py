@@ -1,19 +1,16 @@
-import logging
 from pathlib import Path
 
-# Create base directories
+# Base directories, created when the downloader runs rather than on import
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / 'data'
 ARTICLES_DIR = DATA_DIR / 'articles'
 
-# Create directories if they don't exist
-DATA_DIR.mkdir(exist_ok=True)
-ARTICLES_DIR.mkdir(exist_ok=True)
-
 CONFIG = {
     'USER_AGENT': 'F1_RAG (your-email@gmail.com)',
     'LANGUAGE': 'en',
     'MAX_DEPTH': 3,  # How deep to traverse subcategories
     'CATEGORY': 'Formula_One_races',
+    'DOWNLOAD_WORKERS': 8,  # Categories and articles downloaded concurrently
+    'SHARD_SIZE': None,  # Bytes per JSON Lines file of articles, None for one text file per article
     'ARTICLES_DIR': ARTICLES_DIR
-}
\ No newline at end of file
+}
@@ -10,39 +10,56 @@ The module reads configuration from config/defaults.py including:
 - CATEGORY: The Wikipedia category to download articles from
 - MAX_DEPTH: Maximum depth to traverse category tree
 - ARTICLES_DIR: Directory to save downloaded articles
+- DOWNLOAD_WORKERS: Number of categories and articles downloaded concurrently
+- SHARD_SIZE: Maximum size of the JSON Lines files the articles are appended to,
+  None to save each article to its own text file (the format indexed by the RAG system)
 
 This will download all articles from the configured category and save them
-to the specified directory.
+to the specified directory. Run it from the repository root with:
+
+    python -m F1_RAG.wiki_downloader.main
 """
 
+import logging
+
 import wikipediaapi
-from config.defaults import CONFIG
 from F1_RAG.config.logging_config import setup_logging
-from wiki_downloader import WikiCategoryDownloader
+from F1_RAG.wiki_downloader.config.defaults import CONFIG
+from F1_RAG.wiki_downloader.wiki_downloader import WikiCategoryDownloader
 
-logger = setup_logging()
+# Configure logging
+setup_logging()
+logger = logging.getLogger("F1_RAG.wiki_downloader.main")
 
 def main():
     """Main function to orchestrate the download process."""
     
+    CONFIG['ARTICLES_DIR'].mkdir(parents=True, exist_ok=True)
+    
     logger.info("Initializing Wikipedia API")
     wiki = wikipediaapi.Wikipedia(
         user_agent=CONFIG['USER_AGENT'],
         language=CONFIG['LANGUAGE']
     )
     
-    downloader = WikiCategoryDownloader(wiki, CONFIG['ARTICLES_DIR'])
+    downloader = WikiCategoryDownloader(
+        wiki,
+        CONFIG['ARTICLES_DIR'],
+        user_agent=CONFIG['USER_AGENT'],
+        shard_size=CONFIG['SHARD_SIZE']
+    )
     
     logger.info(f"Fetching articles from category: {CONFIG['CATEGORY']}")
     articles = downloader.get_categorymembers(
         CONFIG['CATEGORY'], 
-        max_depth=CONFIG['MAX_DEPTH']
+        max_depth=CONFIG['MAX_DEPTH'],
+        max_workers=CONFIG['DOWNLOAD_WORKERS']
     )
     
     logger.info(f"Found {len(articles)} articles")
     logger.info("Downloading and saving article contents...")
     
-    downloader.save_all_articles(articles)
+    downloader.save_all_articles(articles, max_workers=CONFIG['DOWNLOAD_WORKERS'])
 
 if __name__ == "__main__":
     try:
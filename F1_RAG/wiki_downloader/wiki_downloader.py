@@ -6,53 +6,285 @@ It includes a WikiCategoryDownloader class that can recursively traverse categor
 download articles, and save them to local files.
 
 The module handles:
-- Recursive category traversal with configurable depth
+- Breadth-first category traversal with configurable depth
 - Article content extraction including title, URL, summary and full text
-- Safe file naming and storage
-- Duplicate article and category detection
+- Safe file naming and storage, either one text file per article or articles appended
+  to JSON Lines shard files
+- Concurrent category download with a thread pool, and concurrent article download
+  with asyncio, both bound by network latency rather than CPU
+- Duplicate article and category detection, seen articles being tracked as 64-bit
+  title hashes in a sorted numpy array
 - Logging of operations
 
 Classes:
     WikiCategoryDownloader: Main class for downloading and saving Wikipedia category articles
+    ArticleShardWriter: Appends articles to size-bounded JSON Lines files
+    TitleHashSet: Compact set of 64-bit title hashes
 
 Dependencies:
     - wikipediaapi: For accessing Wikipedia content
+    - concurrent.futures: For downloading categories concurrently
+    - async_fetch: For downloading articles concurrently
     - pathlib: For file path handling
+    - json: For the JSON Lines shard files
+    - numpy: For the sorted array of seen title hashes
     - logging: For operation logging
-    - re: For filename sanitization
+    - str.translate: For filename sanitization
 """
 
 import wikipediaapi
+import asyncio
+import hashlib
+import httpx
+import json
 import logging
-from pathlib import Path
-from typing import List, Set
+import os
 import re
+import threading
+from collections.abc import MutableSet
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import quote
+
+import numpy as np
+from F1_RAG.wiki_downloader.async_fetch import create_client, fetch_extract, split_extract
 
 logger = logging.getLogger("F1_RAG.wiki_downloader")
 
+class _SafeFilenameTable(dict):
+    """
+    Translation table for str.translate creating safe filenames.
+    
+    Word characters (letters, digits and underscores, in any script) are kept,
+    whitespace and hyphens become spaces, and other characters are removed.
+    Each character is classified on first use and memoized, which covers Unicode
+    titles without building a table of every code point.
+    """
+    
+    def __missing__(self, code_point: int):
+        char = chr(code_point)
+        if char.isalnum() or char == '_':
+            translation = code_point
+        elif char.isspace() or char == '-':
+            translation = ' '
+        else:
+            translation = None
+        self[code_point] = translation
+        return translation
+
+_SAFE_FILENAME_TABLE = _SafeFilenameTable()
+
+# Characters MediaWiki leaves unescaped in page URLs
+_URL_SAFE_CHARS = ";@$!*(),/~:"
+
+class TitleHashSet(MutableSet):
+    """
+    Set of 64-bit title hashes stored in a sorted numpy array.
+    
+    A Python set costs about 70 bytes per integer, against 8 bytes in a uint64 array,
+    which dominates the memory of crawls over millions of articles. New hashes go to a
+    small set buffer, merged into the sorted array once it holds buffer_size hashes;
+    lookups check the buffer, then binary search the array. Sets smaller than
+    buffer_size are therefore plain Python sets.
+    """
+    
+    def __init__(self, hashes: Iterable[int] = (), buffer_size: int = 1 << 16):
+        """
+        Initialize the set.
+        
+        Args:
+            hashes: Initial hashes
+            buffer_size: Number of hashes added between two merges into the sorted array
+            
+        Raises:
+            ValueError: If buffer_size is lower than 1
+        """
+        if buffer_size < 1:
+            raise ValueError(f"buffer_size must be at least 1, got {buffer_size}")
+        self.buffer_size = buffer_size
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self._buffer: Set[int] = set()
+        for value in hashes:
+            self.add(value)
+    
+    def _index(self, value: int) -> Optional[int]:
+        """Return the index of a hash in the sorted array, or None if it is not there."""
+        if not self._sorted.size or not 0 <= value < 1 << 64:
+            return None
+        index = int(np.searchsorted(self._sorted, np.uint64(value)))
+        if index < self._sorted.size and int(self._sorted[index]) == value:
+            return index
+        return None
+    
+    def _merge(self) -> None:
+        """Merge the buffer into the sorted array."""
+        buffer = np.fromiter(self._buffer, dtype=np.uint64, count=len(self._buffer))
+        # Timsort merges the two sorted runs in linear time
+        self._sorted = np.sort(np.concatenate((self._sorted, np.sort(buffer))), kind='stable')
+        self._buffer.clear()
+    
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+        return value in self._buffer or self._index(value) is not None
+    
+    def __iter__(self) -> Iterator[int]:
+        yield from (int(value) for value in self._sorted)
+        yield from self._buffer
+    
+    def __len__(self) -> int:
+        return self._sorted.size + len(self._buffer)
+    
+    def add(self, value: int) -> None:
+        """
+        Add a hash to the set.
+        
+        Args:
+            value: Unsigned 64-bit hash
+        """
+        if self._index(value) is not None:
+            return
+        self._buffer.add(value)
+        if len(self._buffer) >= self.buffer_size:
+            self._merge()
+    
+    def discard(self, value: int) -> None:
+        """
+        Remove a hash from the set if present.
+        
+        Args:
+            value: Unsigned 64-bit hash
+        """
+        if value in self._buffer:
+            self._buffer.discard(value)
+            return
+        index = self._index(value)
+        if index is not None:
+            self._sorted = np.delete(self._sorted, index)
+
+class ArticleShardWriter:
+    """
+    Append articles to JSON Lines shard files of bounded size.
+    
+    Each article is one JSON object on its own line, appended to the current shard
+    through a file kept open between articles: saving an article costs a buffered
+    write instead of creating, opening and closing a file. A new shard is started
+    once the current one would exceed max_bytes. Shards left by a previous run are
+    kept, numbering continues after them.
+    """
+    
+    SHARD_PATTERN = re.compile(r"articles_(\d+)\.jsonl")
+    
+    def __init__(self, directory: Path, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the writer, opening the first shard on the first article.
+        
+        Args:
+            directory: Directory of the shard files
+            max_bytes: Maximum size of a shard in bytes, unless it holds a single larger article
+            
+        Raises:
+            ValueError: If max_bytes is lower than 1
+        """
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be at least 1, got {max_bytes}")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._file: Optional[BinaryIO] = None
+        self._size = 0
+        self._next_index: Optional[int] = None
+        # Articles are written by the executor threads of the event loop
+        self._lock = threading.Lock()
+    
+    def write(self, article: Dict[str, str]) -> None:
+        """
+        Append an article to the current shard.
+        
+        Args:
+            article: Article fields, serialized as one JSON object
+            
+        Raises:
+            IOError: If the shard cannot be opened or written
+        """
+        line = json.dumps(article, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock:
+            if self._file is None or (self._size and self._size + len(line) > self.max_bytes):
+                self._open_next_shard()
+            self._file.write(line)
+            self._size += len(line)
+    
+    def close(self) -> None:
+        """Close the current shard, the next article starting a new one."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def _open_next_shard(self) -> None:
+        """Close the current shard and open the next one."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._next_index is None:
+            existing = [
+                int(match.group(1))
+                for match in map(self.SHARD_PATTERN.fullmatch, os.listdir(self.directory))
+                if match
+            ]
+            self._next_index = max(existing, default=-1) + 1
+        
+        path = self.directory / f"articles_{self._next_index:05d}.jsonl"
+        self._file = path.open('xb')
+        self._next_index += 1
+        self._size = 0
+        logger.debug(f"Writing articles to {path}")
+
 class WikiCategoryDownloader:
     """Class to handle downloading Wikipedia articles from a category."""
     
-    def __init__(self, wiki_api: wikipediaapi.Wikipedia, articles_dir: Path):
+    def __init__(
+        self,
+        wiki_api: wikipediaapi.Wikipedia,
+        articles_dir: Path,
+        user_agent: Optional[str] = None,
+        shard_size: Optional[int] = None
+    ):
         """
         Initialize the downloader with a Wikipedia API instance.
         
         Args:
             wiki_api: Initialized Wikipedia API object
             articles_dir: Directory to save article files
+            user_agent: User agent of the article download requests, as required by Wikipedia
+            shard_size: Maximum size in bytes of the JSON Lines files the articles are appended to,
+                or None to save each article to its own text file
         """
         self.wiki_api = wiki_api
         self.articles_dir = articles_dir
-        self.seen_pages: Set[str] = set()
+        self.user_agent = user_agent
+        self.shard_writer = ArticleShardWriter(articles_dir, shard_size) if shard_size is not None else None
+        # 64-bit hashes of the article titles, much smaller than the titles themselves
+        self.seen_pages = TitleHashSet()
         self.seen_categories: Set[str] = set()
 
-    def get_categorymembers(self, category_name: str, max_depth: int = 1) -> List[wikipediaapi.WikipediaPage]:
+    def get_categorymembers(
+        self,
+        category_name: str,
+        max_depth: int = 1,
+        max_workers: int = 8
+    ) -> List[wikipediaapi.WikipediaPage]:
         """
         Recursively get all articles from a category and its subcategories.
         
+        The category tree is traversed breadth-first: the members of all the categories
+        of a level are fetched concurrently, each fetch being a blocking API request.
+        Seen categories and articles are only updated from the calling thread.
+        
         Args:
             category_name: Name of the category to process
             max_depth: Maximum depth to traverse subcategories
+            max_workers: Number of categories fetched concurrently
             
         Returns:
             List of Wikipedia page objects
@@ -64,26 +296,33 @@ class WikiCategoryDownloader:
             logger.error(f"Category '{category_name}' does not exist!")
             return articles
             
-        def process_category(category: wikipediaapi.WikipediaPage, level: int = 0) -> None:
-            if level > max_depth:
-                return
-                
-            if category.title in self.seen_categories:
-                return
+        def fetch_members(category: wikipediaapi.WikipediaPage) -> List[wikipediaapi.WikipediaPage]:
+            return list(category.categorymembers.values())
+        
+        level_categories = [category]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for level in range(max_depth + 1):
+                pending = []
+                for category in level_categories:
+                    if category.title not in self.seen_categories:
+                        self.seen_categories.add(category.title)
+                        logger.debug(f"Processing category: {category.title} at level {level}")
+                        pending.append(category)
+                if not pending:
+                    break
                 
-            self.seen_categories.add(category.title)
-            logger.debug(f"Processing category: {category.title} at level {level}")
-            
-            for member in category.categorymembers.values():
-                if member.ns == wikipediaapi.Namespace.CATEGORY:
-                    process_category(member, level + 1)
-                else:
-                    if member.title not in self.seen_pages:
-                        self.seen_pages.add(member.title)
-                        articles.append(member)
-                        logger.debug(f"Added article: {member.title}")
-        
-        process_category(category)
+                level_categories = []
+                for members in executor.map(fetch_members, pending):
+                    for member in members:
+                        if member.ns == wikipediaapi.Namespace.CATEGORY:
+                            level_categories.append(member)
+                        else:
+                            title_hash = self._title_hash(member.title)
+                            if title_hash not in self.seen_pages:
+                                self.seen_pages.add(title_hash)
+                                articles.append(member)
+                                logger.debug(f"Added article: {member.title}")
+        
         return articles
 
     def save_article(self, article: wikipediaapi.WikipediaPage) -> None:
@@ -93,33 +332,154 @@ class WikiCategoryDownloader:
         Args:
             article: Wikipedia page object to save
         """
+        # Fetch the content before opening the file
+        self._write_article(article.title, self._article_url(article), article.summary, article.text)
+
+    def save_all_articles(self, articles: List[wikipediaapi.WikipediaPage], max_workers: int = 8) -> None:
+        """
+        Save all downloaded articles to individual files, or to the shard files.
+        
+        The articles are downloaded with asyncio rather than through wikipediaapi, which
+        blocks on one request per article: the requests share one HTTP client keeping its
+        connections alive, up to max_workers of them being in flight at the same time.
+        The files are written by the default executor of the event loop. This method runs
+        its own event loop: from a coroutine, await asave_all_articles instead.
+        
+        Args:
+            articles: List of Wikipedia page objects to save
+            max_workers: Number of articles downloaded concurrently
+            
+        Raises:
+            ValueError: If max_workers is lower than 1
+            RuntimeError: If called from a running event loop
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("save_all_articles cannot run inside an event loop, await asave_all_articles instead")
+        asyncio.run(self.asave_all_articles(articles, max_workers))
+
+    async def asave_all_articles(self, articles: List[wikipediaapi.WikipediaPage], max_workers: int = 8) -> None:
+        """
+        Save all downloaded articles from a running event loop.
+        
+        Args:
+            articles: List of Wikipedia page objects to save
+            max_workers: Number of articles downloaded concurrently
+            
+        Raises:
+            ValueError: If max_workers is lower than 1
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        
+        logger.debug(f"Saving {len(articles)} articles to {self.articles_dir} with {max_workers} workers")
+        try:
+            await self._save_all_articles_async(articles, max_workers)
+        finally:
+            self.close()
+        logger.debug("Finished saving all articles")
+
+    def close(self) -> None:
+        """Close the shard file of the saved articles, if any."""
+        if self.shard_writer is not None:
+            self.shard_writer.close()
+
+    async def _save_all_articles_async(self, articles: List[wikipediaapi.WikipediaPage], max_workers: int) -> None:
+        """Download and save the articles concurrently."""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_workers)
+        
+        async with create_client(self.user_agent, max_connections=max_workers) as client:
+            async def download(article: wikipediaapi.WikipediaPage) -> None:
+                try:
+                    extract = await fetch_extract(client, semaphore, article.title, article.language)
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    # One failed article must not cancel the other downloads
+                    logger.error(f"Error downloading article {article.title}: {e}")
+                    return
+                if extract is None:
+                    return
+                
+                summary, text = split_extract(extract)
+                await loop.run_in_executor(
+                    None, self._write_article, article.title, self._article_url(article), summary, text
+                )
+            
+            await asyncio.gather(*(download(article) for article in articles))
+
+    def _write_article(self, title: str, url: str, summary: str, text: str) -> None:
+        """
+        Write an article to its file, or to the current shard, in a single call.
+        
+        Args:
+            title: Article title
+            url: Article URL
+            summary: Article summary
+            text: Article full text
+        """
+        if self.shard_writer is not None:
+            try:
+                self.shard_writer.write({"title": title, "url": url, "summary": summary, "text": text})
+                logger.debug(f"Saved article: {title}")
+            except IOError as e:
+                logger.error(f"Error saving article {title}: {e}")
+            return
+        
         # Create a safe filename from the article title
-        safe_filename = self._create_safe_filename(article.title)
+        safe_filename = self._create_safe_filename(title)
         file_path = self.articles_dir / f"{safe_filename}.txt"
         
+        body = (
+            f"Title: {title}\n"
+            f"URL: {url}\n\n"
+            "=== Summary ===\n"
+            f"{summary}\n\n"
+            "=== Full Text ===\n"
+            f"{text}"
+        )
+        
         try:
             with file_path.open('w', encoding='utf-8') as f:
-                f.write(f"Title: {article.title}\n")
-                f.write(f"URL: {article.fullurl}\n\n")
-                f.write("=== Summary ===\n")
-                f.write(f"{article.summary}\n\n")
-                f.write("=== Full Text ===\n")
-                f.write(article.text)
-            logger.debug(f"Saved article: {article.title}")
+                f.write(body)
+            logger.debug(f"Saved article: {title}")
         except IOError as e:
-            logger.error(f"Error saving article {article.title}: {e}")
+            logger.error(f"Error saving article {title}: {e}")
 
-    def save_all_articles(self, articles: List[wikipediaapi.WikipediaPage]) -> None:
+    @staticmethod
+    def _title_hash(title: str) -> int:
         """
-        Save all downloaded articles to individual files.
+        Hash an article title to a 64-bit integer.
+        
+        Unlike hash(), the result does not depend on the process, so hashes can be
+        compared across runs and processes.
         
         Args:
-            articles: List of Wikipedia page objects to save
+            title: Article title
+            
+        Returns:
+            64-bit hash of the title
         """
-        logger.debug(f"Saving {len(articles)} articles to {self.articles_dir}")
-        for article in articles:
-            self.save_article(article)
-        logger.debug("Finished saving all articles")
+        return int.from_bytes(hashlib.blake2b(title.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    @staticmethod
+    def _article_url(article: wikipediaapi.WikipediaPage) -> str:
+        """
+        Build the URL of an article from its title.
+        
+        Reading article.fullurl costs an API request per article, on top of the
+        request fetching its text. The URL is built the way MediaWiki builds it instead.
+        
+        Args:
+            article: Wikipedia page object
+            
+        Returns:
+            URL of the article
+        """
+        path = quote(article.title.replace(' ', '_'), safe=_URL_SAFE_CHARS)
+        return f"https://{article.language}.wikipedia.org/wiki/{path}"
 
     @staticmethod
     def _create_safe_filename(title: str) -> str:
@@ -132,7 +492,6 @@ class WikiCategoryDownloader:
         Returns:
             Safe filename string
         """
-        # Remove unsafe characters and replace spaces with underscores
-        safe_name = re.sub(r'[^\w\s-]', '', title)
-        safe_name = re.sub(r'[-\s]+', '_', safe_name)
-        return safe_name.strip('-_')
\ No newline at end of file
+        # Remove unsafe characters, then replace runs of spaces and hyphens with underscores
+        safe_name = '_'.join(title.translate(_SAFE_FILENAME_TABLE).split())
+        return safe_name.strip('_')
\ No newline at end of file